@@ -38,7 +38,7 @@ def main() -> None:
     tab1, tab2 = st.tabs(["GPX分析", "ヘルプ"])
 
     with tab1:
-        render_gpx_analysis_tab()
+        render_gpx_analysis_tab(st.session_state.gpx_service)
 
     with tab2:
         render_help_tab()
@@ -4,17 +4,29 @@ GPX service module that provides high-level operations for GPX analysis.
 This module serves as the main interface for GPX-related operations in the application.
 """
 
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
 from typing import TYPE_CHECKING, BinaryIO
 
-import polars as pl
+import numpy as np
 
-from project.application_services.marker_manager import MarkerManager, Segment
-from project.data_accessors.gpx_analyzer import GPXAnalyzer, GPXStats
+from project.application_services.marker_manager import Marker, MarkerManager, Segment
 from project.data_accessors.gpx_loader import GPXLoader
 
 if TYPE_CHECKING:
+    import polars as pl
     from gpxpy.gpx import GPX
 
+    from project.data_accessors.gpx_analyzer import GPXAnalyzer, GPXStats
+
+# Analyzers of recently loaded files keyed by content hash (LRU), shared by all sessions of the app
+# process so each file is parsed, and its track arrays, statistics and nearest-point KD-tree built, once
+_ANALYZER_CACHE_SIZE = 4
+_analyzer_cache: OrderedDict[str, GPXAnalyzer] = OrderedDict()
+_analyzer_cache_lock = threading.Lock()
+
 
 class GPXService:
     """Service class for GPX analysis operations."""
@@ -24,6 +36,24 @@ class GPXService:
         self._gpx: GPX | None = None
         self._analyzer: GPXAnalyzer | None = None
         self._marker_manager: MarkerManager | None = None
+        self._content_hash: str | None = None
+        self._segments_df_cache: tuple[str, pl.DataFrame] | None = None
+
+    @property
+    def _loaded_analyzer(self) -> GPXAnalyzer:
+        """Analyzer for the loaded track; the single "data loaded" precondition for analyzer calls."""
+        if self._analyzer is None:
+            msg = "No GPX data loaded"
+            raise ValueError(msg)
+        return self._analyzer
+
+    @property
+    def _loaded_marker_manager(self) -> MarkerManager:
+        """Marker manager for the loaded track; the single "data loaded" precondition for marker calls."""
+        if self._marker_manager is None:
+            msg = "No GPX data loaded"
+            raise ValueError(msg)
+        return self._marker_manager
 
     def load_from_file(self, file: BinaryIO) -> None:
         """
@@ -35,10 +65,7 @@ class GPXService:
         Raises:
             GPXLoadError: If the file cannot be loaded or parsed
         """
-        self._gpx = GPXLoader.load_from_file(file)
-        self._analyzer = GPXAnalyzer(self._gpx)
-        self._marker_manager = MarkerManager(self._analyzer)
-        self._load_waypoints_as_markers()
+        self._load_content(GPXLoader.read_file(file))
 
     def load_from_url(self, url: str) -> None:
         """
@@ -50,11 +77,75 @@ class GPXService:
         Raises:
             GPXLoadError: If the URL cannot be accessed or parsed
         """
-        self._gpx = GPXLoader.load_from_url(url)
-        self._analyzer = GPXAnalyzer(self._gpx)
+        self._load_content(GPXLoader.download(url))
+
+    def _load_content(self, content: bytes | bytearray) -> None:
+        """
+        Load raw GPX file content, parsing it only if no analyzer for the same content is cached.
+
+        Args:
+            content: Bytes of a GPX file
+
+        Raises:
+            GPXLoadError: If the content cannot be parsed
+        """
+        content_hash = GPXLoader.hash_content(content)
+        with _analyzer_cache_lock:
+            analyzer = _analyzer_cache.get(content_hash)
+
+        gpx = analyzer.gpx if analyzer is not None else GPXLoader.load_from_bytes(content)
+        self.load_gpx(gpx, content_hash=content_hash)
+
+    def load_gpx(self, gpx: GPX, content_hash: str | None = None) -> None:
+        """
+        Load already parsed GPX data.
+
+        Args:
+            gpx: Parsed GPX object
+            content_hash: Optional hash of the file content (see GPXLoader.hash_content),
+                used by callers as a cache key for derived data
+        """
+        self._content_hash = content_hash
+        self._analyzer = self._get_analyzer(gpx, content_hash)
+        # The cached analyzer's GPX when one exists, so the service and analyzer always share one object
+        self._gpx = self._analyzer.gpx
         self._marker_manager = MarkerManager(self._analyzer)
+        self._segments_df_cache = None
         self._load_waypoints_as_markers()
 
+    @staticmethod
+    def _get_analyzer(gpx: GPX, content_hash: str | None) -> GPXAnalyzer:
+        """
+        Get the analyzer for a GPX track, reusing a cached one for known file content.
+
+        Analyzers only read the GPX data and compute derived data lazily, so one
+        instance can serve every session that loads the same file.
+
+        Args:
+            gpx: Parsed GPX object
+            content_hash: Hash of the file content, or None if unknown
+
+        Returns:
+            Analyzer for the track
+        """
+        # Deferred so the page shell renders before scipy/polars are imported
+        from project.data_accessors.gpx_analyzer import GPXAnalyzer  # noqa: PLC0415
+
+        if content_hash is None:
+            return GPXAnalyzer(gpx)
+
+        with _analyzer_cache_lock:
+            analyzer = _analyzer_cache.get(content_hash)
+            if analyzer is None:
+                analyzer = GPXAnalyzer(gpx)
+                _analyzer_cache[content_hash] = analyzer
+                if len(_analyzer_cache) > _ANALYZER_CACHE_SIZE:
+                    _analyzer_cache.popitem(last=False)
+            else:
+                _analyzer_cache.move_to_end(content_hash)
+
+        return analyzer
+
     def is_loaded(self) -> bool:
         """
         Check if GPX data is loaded.
@@ -64,6 +155,15 @@ class GPXService:
         """
         return self._gpx is not None
 
+    def get_content_hash(self) -> str | None:
+        """
+        Get the hash of the loaded GPX file content.
+
+        Returns:
+            Hex digest of the content, or None if the GPX was passed to load_gpx without a content hash
+        """
+        return self._content_hash
+
     def get_stats(self) -> GPXStats:
         """
         Get overall statistics for the loaded GPX track.
@@ -74,10 +174,7 @@ class GPXService:
         Raises:
             ValueError: If no GPX data is loaded
         """
-        if self._analyzer is None:
-            msg = "No GPX data loaded"
-            raise ValueError(msg)
-        return self._analyzer.calculate_stats()
+        return self._loaded_analyzer.calculate_stats()
 
     def get_track_dataframe(self) -> pl.DataFrame:
         """
@@ -89,10 +186,7 @@ class GPXService:
         Raises:
             ValueError: If no GPX data is loaded
         """
-        if self._analyzer is None:
-            msg = "No GPX data loaded"
-            raise ValueError(msg)
-        return self._analyzer.get_dataframe()
+        return self._loaded_analyzer.get_dataframe()
 
     def add_marker(self, name: str, latitude: float, longitude: float, insert_before_last: bool = False) -> None:
         """
@@ -107,10 +201,7 @@ class GPXService:
         Raises:
             ValueError: If no GPX data is loaded
         """
-        if self._marker_manager is None:
-            msg = "No GPX data loaded"
-            raise ValueError(msg)
-        self._marker_manager.add_marker(name, latitude, longitude, insert_before_last)
+        self._loaded_marker_manager.add_marker(name, latitude, longitude, insert_before_last)
 
     def remove_marker(self, index: int) -> None:
         """
@@ -122,10 +213,7 @@ class GPXService:
         Raises:
             ValueError: If no GPX data is loaded
         """
-        if self._marker_manager is None:
-            msg = "No GPX data loaded"
-            raise ValueError(msg)
-        self._marker_manager.remove_marker(index)
+        self._loaded_marker_manager.remove_marker(index)
 
     def clear_markers(self) -> None:
         """
@@ -134,25 +222,32 @@ class GPXService:
         Raises:
             ValueError: If no GPX data is loaded
         """
-        if self._marker_manager is None:
-            msg = "No GPX data loaded"
-            raise ValueError(msg)
-        self._marker_manager.clear_markers()
+        self._loaded_marker_manager.clear_markers()
 
-    def get_markers(self) -> list:
+    def get_markers(self) -> tuple[Marker, ...]:
         """
         Get all markers.
 
         Returns:
-            List of Marker objects
+            Tuple of Marker objects
 
         Raises:
             ValueError: If no GPX data is loaded
         """
-        if self._marker_manager is None:
-            msg = "No GPX data loaded"
-            raise ValueError(msg)
-        return self._marker_manager.get_all_markers()
+        return self._loaded_marker_manager.get_all_markers()
+
+    def get_marker_distances_km(self) -> np.ndarray:
+        """
+        Get the distance from start of every marker.
+
+        Returns:
+            Distances in kilometers, in marker order
+
+        Raises:
+            ValueError: If no GPX data is loaded
+        """
+        markers = self._loaded_marker_manager.get_all_markers()
+        return np.array([marker.track_point.distance_from_start for marker in markers]) / 1000.0
 
     def get_segments(self) -> list[Segment]:
         """
@@ -164,10 +259,7 @@ class GPXService:
         Raises:
             ValueError: If no GPX data is loaded
         """
-        if self._marker_manager is None:
-            msg = "No GPX data loaded"
-            raise ValueError(msg)
-        return self._marker_manager.get_all_segments()
+        return self._loaded_marker_manager.get_all_segments()
 
     def get_segment(self, start_index: int, end_index: int) -> Segment | None:
         """
@@ -183,10 +275,19 @@ class GPXService:
         Raises:
             ValueError: If no GPX data is loaded
         """
-        if self._marker_manager is None:
-            msg = "No GPX data loaded"
-            raise ValueError(msg)
-        return self._marker_manager.get_segment(start_index, end_index)
+        return self._loaded_marker_manager.get_segment(start_index, end_index)
+
+    def get_markers_key(self) -> str:
+        """
+        Get a hashable key describing the current marker layout.
+
+        Returns:
+            Digest of the markers' track point indices and names, in order
+
+        Raises:
+            ValueError: If no GPX data is loaded
+        """
+        return self._loaded_marker_manager.get_layout_key()
 
     def get_segments_dataframe(self) -> pl.DataFrame:
         """
@@ -198,32 +299,50 @@ class GPXService:
         Raises:
             ValueError: If no GPX data is loaded
         """
-        segments = self.get_segments()
-
-        if not segments:
-            return pl.DataFrame(
-                {
-                    "segment": [],
-                    "start": [],
-                    "end": [],
-                    "distance_km": [],
-                    "ascent_m": [],
-                    "descent_m": [],
-                    "gradient_pct": [],
-                }
-            )
-
-        data = {
-            "segment": [f"{i + 1}" for i in range(len(segments))],
-            "start": [seg.start_marker.name for seg in segments],
-            "end": [seg.end_marker.name for seg in segments],
-            "distance_km": [seg.distance / 1000.0 for seg in segments],
-            "ascent_m": [seg.ascent for seg in segments],
-            "descent_m": [seg.descent for seg in segments],
-            "gradient_pct": [seg.avg_gradient for seg in segments],
-        }
-
-        return pl.DataFrame(data)
+        # Reuse the previous frame while the marker layout is unchanged (Streamlit reruns call this every time)
+        markers_key = self.get_markers_key()
+        if self._segments_df_cache is not None and self._segments_df_cache[0] == markers_key:
+            return self._segments_df_cache[1]
+
+        # Built from the segment statistics directly: Segment objects would materialize every track point
+        manager = self._loaded_marker_manager
+        df = self._build_segments_dataframe([m.name for m in manager.get_all_markers()], *manager.get_segments_stats())
+        self._segments_df_cache = (markers_key, df)
+        return df
+
+    @staticmethod
+    def _build_segments_dataframe(
+        marker_names: list[str], distances: np.ndarray, ascents: np.ndarray, descents: np.ndarray
+    ) -> pl.DataFrame:
+        """
+        Build the segment summary DataFrame.
+
+        Args:
+            marker_names: Names of the markers, in order
+            distances: Distance of each segment in meters
+            ascents: Elevation gain of each segment in meters
+            descents: Elevation loss of each segment in meters
+
+        Returns:
+            DataFrame with one row per segment
+        """
+        import polars as pl  # noqa: PLC0415 - only needed once a track is loaded
+
+        # Average gradient in percent; 0 for zero-length segments
+        gradients = np.divide(ascents, distances, out=np.zeros_like(ascents), where=distances > 0) * 100
+
+        return pl.DataFrame(
+            {
+                "segment": np.arange(1, len(distances) + 1).astype(str),
+                "start": marker_names[:-1],
+                "end": marker_names[1:],
+                "distance_km": distances / 1000.0,
+                "ascent_m": ascents,
+                "descent_m": descents,
+                "gradient_pct": gradients,
+            },
+            schema_overrides={"start": pl.String, "end": pl.String},
+        )
 
     def move_marker_up(self, index: int) -> bool:
         """
@@ -238,10 +357,7 @@ class GPXService:
         Raises:
             ValueError: If no GPX data is loaded
         """
-        if self._marker_manager is None:
-            msg = "No GPX data loaded"
-            raise ValueError(msg)
-        return self._marker_manager.move_marker_up(index)
+        return self._loaded_marker_manager.move_marker_up(index)
 
     def move_marker_down(self, index: int) -> bool:
         """
@@ -256,10 +372,7 @@ class GPXService:
         Raises:
             ValueError: If no GPX data is loaded
         """
-        if self._marker_manager is None:
-            msg = "No GPX data loaded"
-            raise ValueError(msg)
-        return self._marker_manager.move_marker_down(index)
+        return self._loaded_marker_manager.move_marker_down(index)
 
     def _load_waypoints_as_markers(self) -> None:
         """
@@ -272,34 +385,27 @@ class GPXService:
             return
 
         # Get track points to add start and end as markers
-        track_points = self._analyzer.extract_track_points()
-
-        if track_points:
-            # Add start point as first marker
-            start_point = track_points[0]
-            self._marker_manager.add_marker(
-                name="スタート",
-                latitude=start_point.latitude,
-                longitude=start_point.longitude,
-            )
-
-            # Add waypoints from GPX
-            waypoints = self._analyzer.extract_waypoints()
-            for waypoint in waypoints:
-                self._marker_manager.add_marker(
-                    name=waypoint.name,
-                    latitude=waypoint.latitude,
-                    longitude=waypoint.longitude,
-                )
-
-            # Add end point as last marker
-            if len(track_points) > 1:
-                end_point = track_points[-1]
-                self._marker_manager.add_marker(
-                    name="ゴール",
-                    latitude=end_point.latitude,
-                    longitude=end_point.longitude,
-                )
+        point_count = self._analyzer.get_track_point_count()
+
+        if point_count:
+            # Start point, waypoints from GPX, then end point, snapped to the track in one batch
+            start_point = self._analyzer.get_track_point(0)
+            names = ["スタート"]
+            latitudes = [start_point.latitude]
+            longitudes = [start_point.longitude]
+
+            for waypoint in self._analyzer.extract_waypoints():
+                names.append(waypoint.name)
+                latitudes.append(waypoint.latitude)
+                longitudes.append(waypoint.longitude)
+
+            if point_count > 1:
+                end_point = self._analyzer.get_track_point(-1)
+                names.append("ゴール")
+                latitudes.append(end_point.latitude)
+                longitudes.append(end_point.longitude)
+
+            self._marker_manager.add_markers(names, latitudes, longitudes)
 
     def get_waypoint_count(self) -> int:
         """
@@ -317,3 +423,5 @@ class GPXService:
         self._gpx = None
         self._analyzer = None
         self._marker_manager = None
+        self._content_hash = None
+        self._segments_df_cache = None
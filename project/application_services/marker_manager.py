@@ -5,9 +5,19 @@ This module provides functionality to manage markers on the GPX track and
 calculate distances and elevation changes between them.
 """
 
+from __future__ import annotations
+
+import hashlib
 from dataclasses import dataclass
+from itertools import pairwise
+from typing import TYPE_CHECKING
+
+import numpy as np
 
-from project.data_accessors.gpx_analyzer import GPXAnalyzer, TrackPoint
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from project.data_accessors.gpx_analyzer import GPXAnalyzer, TrackPoint
 
 
 @dataclass
@@ -18,7 +28,6 @@ class Marker:
     latitude: float
     longitude: float
     track_point: TrackPoint  # The actual point on the GPX track
-    index: int  # Marker index in the list
 
 
 @dataclass
@@ -46,6 +55,11 @@ class MarkerManager:
         """
         self.analyzer = analyzer
         self.markers: list[Marker] = []
+        # Track point index of each marker, kept parallel to self.markers for vectorized segment stats
+        self._point_indices: np.ndarray = np.empty(0, dtype=np.int64)
+        self._markers_view: tuple[Marker, ...] | None = None
+        self._layout_key: str | None = None
+        self._segments_cache: list[Segment] | None = None
 
     def add_marker(self, name: str, latitude: float, longitude: float, insert_before_last: bool = False) -> Marker:
         """
@@ -74,18 +88,51 @@ class MarkerManager:
             latitude=track_point.latitude,
             longitude=track_point.longitude,
             track_point=track_point,
-            index=insert_position,
         )
 
         # Insert at the determined position
         self.markers.insert(insert_position, marker)
-
-        # Update indices of all markers after the insertion point
-        for i in range(insert_position + 1, len(self.markers)):
-            self.markers[i].index = i
+        self._point_indices = np.insert(self._point_indices, insert_position, track_point.index)
+        self._invalidate_caches()
 
         return marker
 
+    def add_markers(
+        self, names: Sequence[str], latitudes: Sequence[float], longitudes: Sequence[float]
+    ) -> list[Marker]:
+        """
+        Append several markers to the end of the track's marker list.
+
+        All coordinates are snapped to the track in a single nearest-point query.
+
+        Args:
+            names: Names/labels for the markers
+            latitudes: Latitude coordinates
+            longitudes: Longitude coordinates
+
+        Returns:
+            The created Marker objects
+        """
+        track_points = self.analyzer.find_nearest_points(latitudes, longitudes)
+
+        markers = [
+            Marker(
+                name=name,
+                latitude=track_point.latitude,
+                longitude=track_point.longitude,
+                track_point=track_point,
+            )
+            for name, track_point in zip(names, track_points, strict=True)
+        ]
+
+        self.markers.extend(markers)
+        self._point_indices = np.concatenate(
+            (self._point_indices, np.fromiter((p.index for p in track_points), dtype=np.int64, count=len(markers)))
+        )
+        self._invalidate_caches()
+
+        return markers
+
     def remove_marker(self, index: int) -> None:
         """
         Remove a marker by its index.
@@ -95,13 +142,14 @@ class MarkerManager:
         """
         if 0 <= index < len(self.markers):
             self.markers.pop(index)
-            # Update indices of remaining markers
-            for i, marker in enumerate(self.markers):
-                marker.index = i
+            self._point_indices = np.delete(self._point_indices, index)
+            self._invalidate_caches()
 
     def clear_markers(self) -> None:
         """Remove all markers."""
         self.markers.clear()
+        self._point_indices = np.empty(0, dtype=np.int64)
+        self._invalidate_caches()
 
     def get_marker(self, index: int) -> Marker | None:
         """
@@ -117,14 +165,36 @@ class MarkerManager:
             return self.markers[index]
         return None
 
-    def get_all_markers(self) -> list[Marker]:
+    def get_all_markers(self) -> tuple[Marker, ...]:
         """
         Get all markers.
 
+        The returned tuple is cached until the marker list changes, so repeated
+        reads on every rerun do not copy the list.
+
+        Returns:
+            Tuple of all markers
+        """
+        if self._markers_view is None:
+            self._markers_view = tuple(self.markers)
+        return self._markers_view
+
+    def get_layout_key(self) -> str:
+        """
+        Get a key identifying the current marker layout (track points and names, in order).
+
+        The key is a digest of the marker point index array and the names,
+        cached until the marker list changes.
+
         Returns:
-            List of all markers
+            Hex digest that changes whenever markers are added, removed, reordered or renamed
         """
-        return self.markers.copy()
+        if self._layout_key is None:
+            layout_hash = hashlib.blake2b(digest_size=16)
+            layout_hash.update(self._point_indices.tobytes())
+            layout_hash.update("\0".join(m.name for m in self.markers).encode())
+            self._layout_key = layout_hash.hexdigest()
+        return self._layout_key
 
     def get_segment(self, start_index: int, end_index: int) -> Segment | None:
         """
@@ -165,15 +235,50 @@ class MarkerManager:
         """
         Get all segments between consecutive markers.
 
+        Results are cached until the marker list changes.
+
         Returns:
             List of Segment objects
         """
+        if self._segments_cache is not None:
+            return self._segments_cache.copy()
+
+        # Compute all segment statistics in one vectorized analyzer call
+        indices = self._point_indices
+        distances, ascents, descents = self.get_segments_stats()
+        starts = np.minimum(indices[:-1], indices[1:]).tolist()
+        ends = np.maximum(indices[:-1], indices[1:]).tolist()
+
         segments = []
-        for i in range(len(self.markers) - 1):
-            segment = self.get_segment(i, i + 1)
-            if segment is not None:
-                segments.append(segment)
-        return segments
+        for (start_marker, end_marker), distance, ascent, descent, start_idx, end_idx in zip(
+            pairwise(self.markers), distances.tolist(), ascents.tolist(), descents.tolist(), starts, ends, strict=True
+        ):
+            segments.append(
+                Segment(
+                    start_marker=start_marker,
+                    end_marker=end_marker,
+                    distance=distance,
+                    ascent=ascent,
+                    descent=descent,
+                    track_points=self.analyzer.get_track_points(start_idx, end_idx + 1),
+                    avg_gradient=(ascent / distance * 100) if distance > 0 else 0.0,
+                )
+            )
+
+        self._segments_cache = segments
+        return segments.copy()
+
+    def get_segments_stats(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the statistics of all segments between consecutive markers.
+
+        get_all_segments and the segments DataFrame are both built from these arrays;
+        calling this directly skips building Segment objects and track point lists.
+
+        Returns:
+            Tuple of (distances, ascents, descents) arrays in meters, one entry per segment
+        """
+        return self.analyzer.get_segments_stats(self._point_indices)
 
     def get_marker_count(self) -> int:
         """
@@ -199,10 +304,8 @@ class MarkerManager:
 
         # Swap with previous marker
         self.markers[index], self.markers[index - 1] = self.markers[index - 1], self.markers[index]
-
-        # Update indices
-        self.markers[index - 1].index = index - 1
-        self.markers[index].index = index
+        self._point_indices[[index - 1, index]] = self._point_indices[[index, index - 1]]
+        self._invalidate_caches()
 
         return True
 
@@ -221,9 +324,13 @@ class MarkerManager:
 
         # Swap with next marker
         self.markers[index], self.markers[index + 1] = self.markers[index + 1], self.markers[index]
-
-        # Update indices
-        self.markers[index].index = index
-        self.markers[index + 1].index = index + 1
+        self._point_indices[[index, index + 1]] = self._point_indices[[index + 1, index]]
+        self._invalidate_caches()
 
         return True
+
+    def _invalidate_caches(self) -> None:
+        """Drop cached views derived from the marker list."""
+        self._markers_view = None
+        self._layout_key = None
+        self._segments_cache = None
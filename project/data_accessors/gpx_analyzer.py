@@ -8,19 +8,23 @@ and process elevation data from GPX files using industry-standard algorithms.
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
+from operator import attrgetter
 from typing import TYPE_CHECKING
 
 import numpy as np
 import polars as pl
-from scipy.signal import savgol_filter
 
 from project.settings import settings
 
 if TYPE_CHECKING:
-    from gpxpy.gpx import GPX, GPXTrackPoint
+    from collections.abc import Sequence
 
+    from gpxpy.gpx import GPX
+    from scipy.spatial import KDTree
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class TrackPoint:
     """Represents a single point on the GPS track."""
 
@@ -32,7 +36,7 @@ class TrackPoint:
     course: float | None = None  # Direction of travel in degrees (0-360, None if not available)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Waypoint:
     """Represents a waypoint from GPX file."""
 
@@ -43,7 +47,7 @@ class Waypoint:
     description: str | None = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GPXStats:
     """Statistics extracted from GPX data."""
 
@@ -55,6 +59,46 @@ class GPXStats:
     total_points: int  # Number of track points
 
 
+@dataclass
+class _TrackArrays:
+    """Columnar (structure-of-arrays) storage of the track point fields."""
+
+    latitudes: np.ndarray  # Latitudes in degrees
+    longitudes: np.ndarray  # Longitudes in degrees
+    latitudes_rad: np.ndarray  # Latitudes in radians
+    longitudes_rad: np.ndarray  # Longitudes in radians
+    cos_latitudes: np.ndarray  # cos(latitude), shared by the haversine and nearest-point code
+    elevations: np.ndarray  # Elevations in meters
+    distances: np.ndarray  # Cumulative distance from start in meters
+    courses: list[float | None]  # Direction of travel in degrees (None if not available)
+
+
+@dataclass
+class _ElevationProfile:
+    """Smoothed elevation profile used for ascent/descent calculations."""
+
+    distances: np.ndarray  # Distance from start of each sample in meters
+    elevations: np.ndarray  # Cleaned and smoothed elevation of each sample in meters
+    resampled: bool  # True if samples are on a regular distance grid rather than the track points
+
+
+@dataclass
+class _ElevationTotals:
+    """Cumulative elevation gain/loss from the start of the track."""
+
+    ascent: np.ndarray  # Total ascent up to each track point in meters
+    descent: np.ndarray  # Total descent up to each track point in meters
+
+
+@lru_cache(maxsize=8)
+def _savgol_coefficients(window_length: int, polyorder: int) -> np.ndarray:
+    """Savitzky-Golay convolution coefficients, solved once per (window_length, polyorder)."""
+    # scipy.signal is slow to import, so defer it until the first smoothing pass
+    from scipy.signal import savgol_coeffs  # noqa: PLC0415
+
+    return savgol_coeffs(window_length, polyorder)
+
+
 class GPXAnalyzer:
     """Class for analyzing GPX track data."""
 
@@ -71,11 +115,38 @@ class GPXAnalyzer:
         self._dataframe: pl.DataFrame | None = None
         self._stats: GPXStats | None = None
         self._waypoints: list[Waypoint] | None = None
+        self._arrays: _TrackArrays | None = None
+        self._profile: _ElevationProfile | None = None
+        self._elevation_totals: _ElevationTotals | None = None
+        self._kdtree: KDTree | None = None
 
     def extract_track_points(self) -> list[TrackPoint]:
         """
         Extract all track points from the GPX file with cumulative distances.
 
+        Track data is stored as columnar arrays; the TrackPoint list is only
+        materialized when this method is called.
+
+        Returns:
+            List of TrackPoint objects
+
+        Raises:
+            ValueError: If no track points are found in the GPX file
+
+        """
+        if self._track_points is None:
+            self._track_points = self._build_track_points(0, len(self._get_track_arrays().distances))
+
+        return self._track_points
+
+    def get_track_points(self, start: int, stop: int) -> list[TrackPoint]:
+        """
+        Get the track points with index in [start, stop).
+
+        Args:
+            start: Index of the first track point
+            stop: Index one past the last track point
+
         Returns:
             List of TrackPoint objects
 
@@ -84,47 +155,138 @@ class GPXAnalyzer:
 
         """
         if self._track_points is not None:
-            return self._track_points
+            return self._track_points[start:stop]
+        return self._build_track_points(start, stop)
+
+    def get_track_point(self, index: int) -> TrackPoint:
+        """
+        Get a single track point.
+
+        Args:
+            index: Index of the track point (negative values count from the end)
+
+        Returns:
+            The TrackPoint at the index
+
+        Raises:
+            ValueError: If no track points are found in the GPX file
+            IndexError: If the index is out of range
+
+        """
+        index = range(self.get_track_point_count())[index]
+        return self.get_track_points(index, index + 1)[0]
+
+    def get_track_point_count(self) -> int:
+        """
+        Get the number of track points.
+
+        Returns:
+            Number of track points
+
+        Raises:
+            ValueError: If no track points are found in the GPX file
+
+        """
+        return len(self._get_track_arrays().distances)
+
+    def _get_track_arrays(self) -> _TrackArrays:
+        """
+        Get the track columns as contiguous arrays.
+
+        Returns:
+            _TrackArrays indexed by track point index
 
-        track_points: list[TrackPoint] = []
-        cumulative_distance = 0.0
-        prev_point: GPXTrackPoint | None = None
-        index = 0
+        Raises:
+            ValueError: If no track points are found in the GPX file
+
+        """
+        if self._arrays is None:
+            self._arrays = self._extract_track_data()
+
+        return self._arrays
+
+    def _build_track_points(self, start: int, stop: int) -> list[TrackPoint]:
+        """
+        Materialize TrackPoint objects for a range of the columnar track data.
+
+        Args:
+            start: Index of the first track point
+            stop: Index one past the last track point
+
+        Returns:
+            List of TrackPoint objects
+
+        """
+        arrays = self._get_track_arrays()
+        columns = zip(
+            arrays.latitudes[start:stop].tolist(),
+            arrays.longitudes[start:stop].tolist(),
+            arrays.elevations[start:stop].tolist(),
+            arrays.distances[start:stop].tolist(),
+            arrays.courses[start:stop],
+            strict=True,
+        )
+        return [
+            TrackPoint(
+                latitude=latitude,
+                longitude=longitude,
+                elevation=elevation,
+                distance_from_start=distance,
+                index=index,
+                course=course,
+            )
+            for index, (latitude, longitude, elevation, distance, course) in enumerate(columns, start)
+        ]
+
+    def _extract_track_data(self) -> _TrackArrays:
+        """
+        Walk the GPX tracks once, building the columnar track arrays.
+
+        Returns:
+            _TrackArrays for all track points
+
+        Raises:
+            ValueError: If no track points are found in the GPX file
+
+        """
+        latitudes: list[float] = []
+        longitudes: list[float] = []
+        elevations: list[float] = []
+        courses: list[float | None] = []
 
         # Extract points from all tracks and segments
         for track in self.gpx.tracks:
             for segment in track.segments:
                 for point in segment.points:
-                    # Calculate distance from previous point
-                    if prev_point is not None:
-                        distance = self._haversine_distance(
-                            prev_point.latitude,
-                            prev_point.longitude,
-                            point.latitude,
-                            point.longitude,
-                        )
-                        cumulative_distance += distance
-
-                    track_points.append(
-                        TrackPoint(
-                            latitude=point.latitude,
-                            longitude=point.longitude,
-                            elevation=point.elevation or 0.0,
-                            distance_from_start=cumulative_distance,
-                            index=index,
-                            course=point.course if hasattr(point, "course") else None,
-                        )
-                    )
-
-                    prev_point = point
-                    index += 1
-
-        if not track_points:
+                    latitudes.append(point.latitude)
+                    longitudes.append(point.longitude)
+                    elevations.append(point.elevation or 0.0)
+                    courses.append(point.course if hasattr(point, "course") else None)
+
+        if not latitudes:
             msg = "No track points found in GPX file"
             raise ValueError(msg)
 
-        self._track_points = track_points
-        return track_points
+        latitudes_array = np.array(latitudes, dtype=np.float64)
+        longitudes_array = np.array(longitudes, dtype=np.float64)
+        latitudes_rad = np.radians(latitudes_array)
+        longitudes_rad = np.radians(longitudes_array)
+        cos_latitudes = np.cos(latitudes_rad)
+
+        # Distances between consecutive points in one vectorized pass, then accumulate
+        segment_distances = self._haversine_distances(latitudes_rad, longitudes_rad, cos_latitudes)
+        distances = np.concatenate(([0.0], np.cumsum(segment_distances)))
+
+        return _TrackArrays(
+            latitudes=latitudes_array,
+            longitudes=longitudes_array,
+            latitudes_rad=latitudes_rad,
+            longitudes_rad=longitudes_rad,
+            cos_latitudes=cos_latitudes,
+            elevations=np.array(elevations, dtype=np.float64),
+            distances=distances,
+            courses=courses,
+        )
 
     def get_dataframe(self) -> pl.DataFrame:
         """
@@ -137,16 +299,17 @@ class GPXAnalyzer:
         if self._dataframe is not None:
             return self._dataframe
 
-        points = self.extract_track_points()
+        arrays = self._get_track_arrays()
 
+        # Numeric columns reuse the contiguous NumPy buffers
         self._dataframe = pl.DataFrame(
             {
-                "latitude": [p.latitude for p in points],
-                "longitude": [p.longitude for p in points],
-                "elevation": [p.elevation for p in points],
-                "distance": [p.distance_from_start for p in points],
-                "index": [p.index for p in points],
-                "course": [p.course for p in points],
+                "latitude": arrays.latitudes,
+                "longitude": arrays.longitudes,
+                "elevation": arrays.elevations,
+                "distance": arrays.distances,
+                "index": np.arange(len(arrays.distances), dtype=np.int64),
+                "course": pl.Series(arrays.courses, dtype=pl.Float64),
             }
         )
 
@@ -162,16 +325,17 @@ class GPXAnalyzer:
         if self._waypoints is not None:
             return self._waypoints
 
-        # Extract waypoints from GPX using list comprehension
+        # Pluck all fields per waypoint in one C-level attrgetter call
+        fields = attrgetter("name", "latitude", "longitude", "elevation", "description")
         waypoints = [
             Waypoint(
-                name=waypoint.name or "Waypoint",
-                latitude=waypoint.latitude,
-                longitude=waypoint.longitude,
-                elevation=waypoint.elevation,
-                description=waypoint.description,
+                name=name or "Waypoint",
+                latitude=latitude,
+                longitude=longitude,
+                elevation=elevation,
+                description=description,
             )
-            for waypoint in self.gpx.waypoints
+            for name, latitude, longitude, elevation, description in map(fields, self.gpx.waypoints)
         ]
 
         self._waypoints = waypoints
@@ -194,43 +358,25 @@ class GPXAnalyzer:
         if self._stats is not None:
             return self._stats
 
-        points = self.extract_track_points()
-        df = self.get_dataframe()
+        arrays = self._get_track_arrays()
 
         # Get raw elevation and distance data
-        distances = df["distance"].to_numpy()
-        elevations = df["elevation"].to_numpy()
-
-        # Step 1: Resample at regular distance intervals (only for long tracks)
-        # This normalizes sampling density and reduces impact of variable recording rates
-        total_distance = distances[-1] if len(distances) > 0 else 0.0
-        if total_distance > settings.min_distance_for_resampling:
-            _, resampled_elevations = self._resample_by_distance(
-                distances, elevations, settings.distance_resampling_meters
-            )
-        else:
-            # Skip resampling for short tracks
-            resampled_elevations = elevations
-
-        # Step 2: Remove outliers (GPS errors, unrealistic spikes)
-        cleaned_elevations = self._remove_outliers(resampled_elevations)
+        distances = arrays.distances
+        elevations = arrays.elevations
 
-        # Step 3: Apply advanced smoothing (Savitzky-Golay filter)
-        smoothed_elevations = self._smooth_elevation_advanced(cleaned_elevations)
+        # Steps 1-3: Resample, remove outliers and smooth (shared with the segment statistics)
+        profile = self._get_elevation_profile()
 
         # Step 4: Calculate ascent/descent with threshold filter
-        ascent, descent = self._calculate_elevation_gain_loss(smoothed_elevations)
-
-        # Get min/max elevation values from original data
-        elevations_array = df["elevation"].to_numpy()
+        ascent, descent = self._calculate_elevation_gain_loss(profile.elevations)
 
         self._stats = GPXStats(
-            total_distance=points[-1].distance_from_start if points else 0.0,
+            total_distance=float(distances[-1]),
             total_ascent=ascent,
             total_descent=descent,
-            min_elevation=float(np.min(elevations_array)),
-            max_elevation=float(np.max(elevations_array)),
-            total_points=len(points),
+            min_elevation=float(np.min(elevations)),
+            max_elevation=float(np.max(elevations)),
+            total_points=len(distances),
         )
 
         return self._stats
@@ -247,18 +393,44 @@ class GPXAnalyzer:
             The nearest TrackPoint on the track
 
         """
-        points = self.extract_track_points()
+        return self.find_nearest_points([latitude], [longitude])[0]
+
+    def find_nearest_points(self, latitudes: Sequence[float], longitudes: Sequence[float]) -> list[TrackPoint]:
+        """
+        Find the nearest track point for each of the given coordinates.
+
+        Track points are indexed once in a KD-tree of unit vectors on the sphere,
+        where straight-line (chord) distance ranks points exactly like the
+        great-circle distance, so each query is O(log N).
 
-        min_distance = float("inf")
-        nearest_point = points[0]
+        Args:
+            latitudes: Target latitudes
+            longitudes: Target longitudes
+
+        Returns:
+            The nearest TrackPoint for each target, in input order
+
+        """
+        if self._kdtree is None:
+            from scipy.spatial import KDTree  # noqa: PLC0415 - deferred like scipy.signal
+
+            arrays = self._get_track_arrays()
+            # Sliding-midpoint splits build ~2x faster than median splits on track-shaped data,
+            # and the tree is queried only a handful of times per load
+            self._kdtree = KDTree(
+                self._to_unit_vectors(arrays.latitudes_rad, arrays.longitudes_rad, arrays.cos_latitudes),
+                balanced_tree=False,
+                compact_nodes=False,
+                copy_data=False,
+            )
 
-        for point in points:
-            distance = self._haversine_distance(latitude, longitude, point.latitude, point.longitude)
-            if distance < min_distance:
-                min_distance = distance
-                nearest_point = point
+        query = self._to_unit_vectors(
+            np.radians(np.asarray(latitudes, dtype=np.float64)),
+            np.radians(np.asarray(longitudes, dtype=np.float64)),
+        )
+        _, nearest_indices = self._kdtree.query(query, k=1)
 
-        return nearest_point
+        return [self.get_track_point(i) for i in nearest_indices.tolist()]
 
     def get_segment_between_points(
         self, start_point: TrackPoint, end_point: TrackPoint
@@ -274,77 +446,165 @@ class GPXAnalyzer:
             Tuple of (segment_points, distance, ascent, descent)
 
         """
-        points = self.extract_track_points()
-
         # Ensure start comes before end
-        start_idx = start_point.index
-        end_idx = end_point.index
-        if start_idx > end_idx:
-            start_idx, end_idx = end_idx, start_idx
-
-        # Extract segment
-        segment = points[start_idx : end_idx + 1]
-
-        # Calculate distance
-        distance = end_point.distance_from_start - start_point.distance_from_start
-
-        # Calculate elevation gain/loss for segment using same method as full track
-        elevations = np.array([p.elevation for p in segment])
-        distances_segment = np.array([p.distance_from_start - start_point.distance_from_start for p in segment])
-
-        # Step 1: Resample at regular distance intervals (only for long segments)
-        segment_distance = abs(distance)
-        if segment_distance > settings.min_distance_for_resampling:
-            _, resampled_elevations = self._resample_by_distance(
-                distances_segment, elevations, settings.distance_resampling_meters
-            )
-        else:
-            # Skip resampling for short segments
-            resampled_elevations = elevations
+        start_idx = min(start_point.index, end_point.index)
+        end_idx = max(start_point.index, end_point.index)
 
-        # Step 2: Remove outliers
-        cleaned_elevations = self._remove_outliers(resampled_elevations)
+        distances, ascents, descents = self.get_segments_stats([start_idx, end_idx])
 
-        # Step 3: Apply smoothing
-        smoothed_elevations = self._smooth_elevation_advanced(cleaned_elevations)
+        return self.get_track_points(start_idx, end_idx + 1), float(distances[0]), float(ascents[0]), float(descents[0])
 
-        # Step 4: Calculate with threshold
-        ascent, descent = self._calculate_elevation_gain_loss(smoothed_elevations)
+    def get_segments_stats(self, indices: Sequence[int] | np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate statistics for every segment between consecutive track point indices.
 
-        return segment, abs(distance), ascent, descent
+        Each segment is a difference of precomputed cumulative totals, so the cost
+        does not depend on the track length. Ascent/descent come from the same
+        smoothed, thresholded profile as the track totals, so segments add up to
+        the track totals.
+
+        Args:
+            indices: Track point indices delimiting the segments (e.g. one per marker)
+
+        Returns:
+            Tuple of (distances, ascents, descents) arrays, one entry per consecutive pair
+
+        """
+        arrays = self._get_track_arrays()
+        totals = self._get_elevation_totals()
+
+        boundaries = np.asarray(indices, dtype=np.intp)
+        start = np.minimum(boundaries[:-1], boundaries[1:])
+        end = np.maximum(boundaries[:-1], boundaries[1:])
+
+        distances = arrays.distances[end] - arrays.distances[start]
+        ascents = totals.ascent[end] - totals.ascent[start]
+        descents = totals.descent[end] - totals.descent[start]
+
+        return distances, ascents, descents
+
+    def _get_elevation_totals(self) -> _ElevationTotals:
+        """
+        Get cumulative elevation gain/loss from the start at every track point.
+
+        Running sums of the threshold-filtered changes of the smoothed profile
+        (the one calculate_stats uses), interpolated back onto the track points
+        when the profile was resampled.
+
+        Returns:
+            _ElevationTotals indexed by track point index
+
+        """
+        if self._elevation_totals is None:
+            distances = self._get_track_arrays().distances
+            profile = self._get_elevation_profile()
+
+            # Step 4: Running sums of the changes that pass the threshold filter
+            ascent_steps, descent_steps = self._threshold_elevation_changes(profile.elevations)
+            ascent = np.concatenate(([0.0], np.cumsum(ascent_steps)))
+            descent = np.concatenate(([0.0], np.cumsum(descent_steps)))
+
+            if profile.resampled:
+                ascent = np.interp(distances, profile.distances, ascent)
+                descent = np.interp(distances, profile.distances, descent)
+
+            self._elevation_totals = _ElevationTotals(ascent=ascent, descent=descent)
+
+        return self._elevation_totals
+
+    def _get_elevation_profile(self) -> _ElevationProfile:
+        """
+        Get the cleaned, smoothed elevation profile of the whole track.
+
+        Computed once and shared by calculate_stats and the segment statistics:
+        1. Distance-based resampling (long tracks only)
+        2. Outlier removal (IQR method)
+        3. Savitzky-Golay smoothing filter
+
+        Returns:
+            _ElevationProfile of the whole track
+
+        """
+        if self._profile is None:
+            arrays = self._get_track_arrays()
+            distances = arrays.distances
+            elevations = arrays.elevations
+
+            # Step 1: Resample at regular distance intervals (only for long tracks)
+            # This normalizes sampling density and reduces impact of variable recording rates
+            resampled = bool(distances[-1] > settings.min_distance_for_resampling)
+            if resampled:
+                distances, elevations = self._resample_by_distance(
+                    distances, elevations, settings.distance_resampling_meters
+                )
+
+            # Step 2: Remove outliers (GPS errors, unrealistic spikes)
+            cleaned_elevations = self._remove_outliers(elevations)
+
+            # Step 3: Apply advanced smoothing (Savitzky-Golay filter)
+            smoothed_elevations = self._smooth_elevation_advanced(cleaned_elevations)
+
+            self._profile = _ElevationProfile(distances=distances, elevations=smoothed_elevations, resampled=resampled)
+
+        return self._profile
 
     @staticmethod
-    def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    def _to_unit_vectors(lat_rad: np.ndarray, lon_rad: np.ndarray, cos_lat: np.ndarray | None = None) -> np.ndarray:
         """
-        Calculate the great circle distance between two points on Earth.
+        Convert spherical coordinates to 3D unit vectors.
 
         Args:
-            lat1: Latitude of first point in degrees
-            lon1: Longitude of first point in degrees
-            lat2: Latitude of second point in degrees
-            lon2: Longitude of second point in degrees
+            lat_rad: Latitudes in radians
+            lon_rad: Longitudes in radians
+            cos_lat: Precomputed cos(lat_rad), computed here if omitted
 
         Returns:
-            Distance in meters
+            Array of shape (N, 3) with one unit vector per coordinate
 
         """
-        # Convert to radians
-        lat1_rad = np.radians(lat1)
-        lon1_rad = np.radians(lon1)
-        lat2_rad = np.radians(lat2)
-        lon2_rad = np.radians(lon2)
+        if cos_lat is None:
+            cos_lat = np.cos(lat_rad)
+        return np.column_stack((cos_lat * np.cos(lon_rad), cos_lat * np.sin(lon_rad), np.sin(lat_rad)))
 
-        # Haversine formula
-        dlat = lat2_rad - lat1_rad
-        dlon = lon2_rad - lon1_rad
+    @staticmethod
+    def _haversine_distances(lat_rad: np.ndarray, lon_rad: np.ndarray, cos_lat: np.ndarray | None = None) -> np.ndarray:
+        """
+        Calculate the great circle distances between consecutive points.
 
-        a = np.sin(dlat / 2.0) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2.0) ** 2
-        c = 2 * np.arcsin(np.sqrt(a))
+        Args:
+            lat_rad: Latitudes in radians
+            lon_rad: Longitudes in radians
+            cos_lat: Precomputed cos(lat_rad), computed here if omitted
+
+        Returns:
+            Array of N-1 distances in meters
+
+        """
+        if cos_lat is None:
+            cos_lat = np.cos(lat_rad)
 
         # Earth radius in meters
         earth_radius = 6371000
 
-        return float(earth_radius * c)
+        # Haversine formula, evaluated in place on two buffers instead of allocating a temporary per step
+        a = np.diff(lat_rad)
+        a *= 0.5
+        np.sin(a, out=a)
+        np.square(a, out=a)
+
+        dlon_term = np.diff(lon_rad)
+        dlon_term *= 0.5
+        np.sin(dlon_term, out=dlon_term)
+        np.square(dlon_term, out=dlon_term)
+        dlon_term *= cos_lat[:-1]
+        dlon_term *= cos_lat[1:]
+
+        a += dlon_term
+        np.sqrt(a, out=a)
+        np.arcsin(a, out=a)
+        a *= 2 * earth_radius
+
+        return a
 
     @staticmethod
     def _resample_by_distance(
@@ -396,9 +656,8 @@ class GPXAnalyzer:
         if len(elevations) < 20:
             return elevations
 
-        # Calculate IQR
-        q1 = np.percentile(elevations, 25)
-        q3 = np.percentile(elevations, 75)
+        # Calculate IQR (both quartiles from a single partition of the data)
+        q1, q3 = np.percentile(elevations, [25, 75])
         iqr = q3 - q1
 
         # Define outlier bounds
@@ -408,16 +667,18 @@ class GPXAnalyzer:
         # Identify outliers
         outliers = (elevations < lower_bound) | (elevations > upper_bound)
 
-        # Replace outliers with interpolated values
-        cleaned = elevations.copy()
-        if np.any(outliers):
-            # Use linear interpolation for outliers
-            indices = np.arange(len(elevations))
-            good_indices = indices[~outliers]
-            good_values = elevations[~outliers]
+        # Nothing to replace: return the input as is instead of copying it
+        if not outliers.any():
+            return elevations
+
+        good_indices = np.flatnonzero(~outliers)
+        if len(good_indices) == 0:
+            return elevations
 
-            if len(good_values) > 0:
-                cleaned[outliers] = np.interp(indices[outliers], good_indices, good_values)
+        # Replace outliers with values linearly interpolated from the good neighbours
+        outlier_indices = np.flatnonzero(outliers)
+        cleaned = elevations.copy()
+        cleaned[outlier_indices] = np.interp(outlier_indices, good_indices, elevations[good_indices])
 
         return cleaned
 
@@ -462,12 +723,10 @@ class GPXAnalyzer:
         polyorder = min(2, window_length - 1)
 
         try:
-            smoothed = savgol_filter(
-                elevations,
-                window_length=window_length,
-                polyorder=polyorder,
-                mode="nearest",
-            )
+            from scipy.ndimage import convolve1d  # noqa: PLC0415 - deferred like scipy.signal
+
+            # Same result as savgol_filter(mode="nearest"), without re-solving the coefficients per call
+            smoothed = convolve1d(elevations, _savgol_coefficients(window_length, polyorder), mode="nearest")
         except (ValueError, np.linalg.LinAlgError):
             # Fallback to original if smoothing fails
             return elevations
@@ -500,12 +759,31 @@ class GPXAnalyzer:
         if len(elevations) < 2:
             return 0.0, 0.0
 
-        # Calculate elevation changes between consecutive points
-        elevation_diffs = np.diff(elevations)
-
         # Apply threshold filter: only count changes above threshold
         # This is the key difference from naive implementation
-        total_ascent = float(np.sum(elevation_diffs[elevation_diffs > threshold]))
-        total_descent = float(np.abs(np.sum(elevation_diffs[elevation_diffs < -threshold])))
+        ascent_steps, descent_steps = GPXAnalyzer._threshold_elevation_changes(elevations, threshold)
 
-        return total_ascent, total_descent
+        return float(ascent_steps.sum()), float(descent_steps.sum())
+
+    @staticmethod
+    def _threshold_elevation_changes(
+        elevations: np.ndarray, threshold: float = settings.elevation_threshold_meters
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Split the elevation changes between consecutive points into ascent and descent steps.
+
+        Changes within the threshold are treated as noise and count as zero. Shared by
+        the track totals and the cumulative totals behind the segment statistics.
+
+        Args:
+            elevations: Array of smoothed elevation values
+            threshold: Minimum elevation change to count (meters)
+
+        Returns:
+            Tuple of (ascent_steps, descent_steps) arrays of N-1 non-negative values in meters
+
+        """
+        elevation_diffs = np.diff(elevations)
+        ascent_steps = np.where(elevation_diffs > threshold, elevation_diffs, 0.0)
+        descent_steps = np.where(elevation_diffs < -threshold, -elevation_diffs, 0.0)
+        return ascent_steps, descent_steps
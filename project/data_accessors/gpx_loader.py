@@ -6,6 +6,8 @@ This module provides functionality to load and parse GPX files from various sour
 
 from __future__ import annotations
 
+import hashlib
+import io
 from typing import TYPE_CHECKING
 
 import gpxpy
@@ -25,6 +27,9 @@ class GPXLoadError(Exception):
     """Exception raised when GPX file cannot be loaded or parsed."""
 
 
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
 class GPXLoader:
     """Class responsible for loading GPX files from various sources."""
 
@@ -43,20 +48,53 @@ class GPXLoader:
             GPXLoadError: If the file cannot be parsed as valid GPX
 
         """
-        # Read file content
-        content = file.read()
+        return GPXLoader.load_from_bytes(GPXLoader.read_file(file))
 
-        # Check file size
-        file_size_mb = len(content) / (1024 * 1024)
-        max_size = settings.max_gpx_file_size_mb
-        if file_size_mb > max_size:
-            msg = f"File size ({file_size_mb:.1f}MB) exceeds maximum allowed size ({max_size}MB)"
-            raise GPXLoadError(msg)
+    @staticmethod
+    def read_file(file: BinaryIO) -> bytes:
+        """
+        Read the content of a GPX file object, checking its size first.
+
+        Args:
+            file: Binary file object containing GPX data
+
+        Returns:
+            Bytes of the file, from its current position
+
+        Raises:
+            GPXLoadError: If the file exceeds the maximum allowed size
+
+        """
+        # Reject oversized files before reading them into memory
+        if file.seekable():
+            position = file.tell()
+            size = file.seek(0, io.SEEK_END) - position
+            file.seek(position)
+            GPXLoader._check_size(size)
+
+        return file.read()
+
+    @staticmethod
+    def load_from_bytes(content: bytes | bytearray) -> GPX:
+        """
+        Load GPX data from raw file content.
+
+        Args:
+            content: Bytes of a GPX file
+
+        Returns:
+            Parsed GPX object
+
+        Raises:
+            GPXLoadError: If the content cannot be parsed as valid GPX
+
+        """
+        GPXLoader._check_size(len(content))
 
         # Parse GPX (decode bytes to string)
         try:
             content_str = content.decode("utf-8")
-            return gpxpy.parse(content_str)
+            gpx = gpxpy.parse(content_str)
         except UnicodeDecodeError as e:
             msg = f"Error decoding GPX file: {e!s}"
             raise GPXLoadError(msg) from e
@@ -67,6 +105,40 @@ class GPXLoader:
             msg = f"Error loading GPX file: {e!s}"
             raise GPXLoadError(msg) from e
 
+        return gpx
+
+    @staticmethod
+    def _check_size(size_bytes: int) -> None:
+        """
+        Check a GPX file size against the configured maximum.
+
+        Args:
+            size_bytes: File size in bytes
+
+        Raises:
+            GPXLoadError: If the size exceeds settings.max_gpx_file_size_mb
+
+        """
+        file_size_mb = size_bytes / (1024 * 1024)
+        max_size = settings.max_gpx_file_size_mb
+        if file_size_mb > max_size:
+            msg = f"File size ({file_size_mb:.1f}MB) exceeds maximum allowed size ({max_size}MB)"
+            raise GPXLoadError(msg)
+
+    @staticmethod
+    def hash_content(content: bytes | bytearray) -> str:
+        """
+        Compute a cache key for raw GPX file content.
+
+        Args:
+            content: Bytes of a GPX file
+
+        Returns:
+            Hex digest identifying the content
+
+        """
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
     @staticmethod
     def load_from_url(url: str, timeout: int = 30) -> GPX:
         """
@@ -82,32 +154,45 @@ class GPXLoader:
         Raises:
             GPXLoadError: If the URL cannot be accessed or parsed as valid GPX
 
+        """
+        return GPXLoader.load_from_bytes(GPXLoader.download(url, timeout))
+
+    @staticmethod
+    def download(url: str, timeout: int = 30) -> bytearray:
+        """
+        Download the content of a GPX file from a URL, checking its size as it arrives.
+
+        Args:
+            url: URL pointing to a GPX file
+            timeout: Request timeout in seconds (default: 30)
+
+        Returns:
+            Bytes of the file
+
+        Raises:
+            GPXLoadError: If the URL cannot be accessed or the file exceeds the maximum allowed size
+
         """
         try:
-            # Fetch GPX file from URL
-            response = requests.get(url, timeout=timeout)
-            response.raise_for_status()
+            # Stream the body so an oversized file is rejected before it is fully downloaded
+            with requests.get(url, timeout=timeout, stream=True) as response:
+                response.raise_for_status()
+
+                content_length = response.headers.get("Content-Length")
+                if content_length is not None and content_length.isdigit():
+                    GPXLoader._check_size(int(content_length))
+
+                content = bytearray()
+                for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                    content.extend(chunk)
+                    GPXLoader._check_size(len(content))
         except requests.exceptions.RequestException as e:
             msg = f"Error fetching GPX from URL: {e!s}"
             raise GPXLoadError(msg) from e
 
-        # Check content size
-        content_length = len(response.content)
-        file_size_mb = content_length / (1024 * 1024)
-        max_size = settings.max_gpx_file_size_mb
-        if file_size_mb > max_size:
-            msg = f"File size ({file_size_mb:.1f}MB) exceeds maximum allowed size ({max_size}MB)"
-            raise GPXLoadError(msg)
-
-        # Parse GPX
-        try:
-            return gpxpy.parse(response.text)
-        except gpxpy.gpx.GPXException as e:
-            msg = f"Invalid GPX file format: {e!s}"
-            raise GPXLoadError(msg) from e
-        except OSError as e:
-            msg = f"Error loading GPX from URL: {e!s}"
-            raise GPXLoadError(msg) from e
+        # Return the raw bytes to parse as UTF-8 (the GPX encoding) instead of response.text,
+        # which may run charset detection over the whole body first
+        return content
 
     @staticmethod
     def load_from_path(file_path: Path) -> GPX:
@@ -32,9 +32,11 @@ class Settings(BaseSettings):
     # Map settings
     default_map_zoom: int = 13
     map_height: int = 600
+    map_simplify_tolerance_m: float = 5.0  # Max deviation when simplifying track lines for the map (about GPS noise)
 
     # Chart settings
     elevation_chart_height: int = 400
+    max_chart_points: int = 4000  # Longer profiles are min/max decimated before plotting
 
 
 # Global settings instance
@@ -4,15 +4,20 @@ Main UI module for the Trail Running GPX Analyzer application.
 This module contains the main user interface logic with tabs for GPX analysis and help.
 """
 
+from __future__ import annotations
+
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import streamlit as st
 from streamlit.runtime.scriptrunner import RerunException
 
 from project.application_services.gpx_service import GPXService
 from project.data_accessors.gpx_loader import GPXLoadError
-from project.views.chart_view import ChartView
-from project.views.map_view import MapView
+from project.views.directions import direction_name
+
+if TYPE_CHECKING:
+    import polars as pl
 
 
 def initialize_session_state() -> None:
@@ -32,11 +37,62 @@ def initialize_session_state() -> None:
     if "selected_segment" not in st.session_state:
         st.session_state.selected_segment = None
 
-    if "last_map_click" not in st.session_state:
-        st.session_state.last_map_click = None
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _shared_track_dataframe(content_hash: str, _service: GPXService) -> pl.DataFrame:  # noqa: ARG001
+    """
+    Build the track DataFrame once per file content, shared across sessions and reloads.
+
+    content_hash is the cache key; _service is excluded from hashing by its leading underscore.
+    """
+    return _service.get_track_dataframe()
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _shared_segments_dataframe(
+    content_hash: str,  # noqa: ARG001
+    markers_key: str,  # noqa: ARG001
+    _service: GPXService,
+) -> pl.DataFrame:
+    """Build the segments DataFrame once per file content and marker layout."""
+    return _service.get_segments_dataframe()
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _shared_segments_csv(
+    content_hash: str,  # noqa: ARG001
+    markers_key: str,  # noqa: ARG001
+    _segments_df: pl.DataFrame,
+) -> str:
+    """Serialize the segments DataFrame to CSV once per file content and marker layout."""
+    return _segments_df.write_csv()
 
 
-def render_gpx_upload() -> None:
+def _get_track_dataframe(service: GPXService) -> pl.DataFrame:
+    """Get the track DataFrame, from the shared cache when the file content is known."""
+    content_hash = service.get_content_hash()
+    if content_hash is None:
+        return service.get_track_dataframe()
+    return _shared_track_dataframe(content_hash, service)
+
+
+def _get_segments_dataframe(service: GPXService) -> pl.DataFrame:
+    """Get the segments DataFrame, from the shared cache when the file content is known."""
+    content_hash = service.get_content_hash()
+    if content_hash is None:
+        return service.get_segments_dataframe()
+    return _shared_segments_dataframe(content_hash, service.get_markers_key(), service)
+
+
+def _get_segments_csv(service: GPXService, segments_df: pl.DataFrame) -> str:
+    """Get the segments CSV, from the shared cache when the file content is known."""
+    content_hash = service.get_content_hash()
+    if content_hash is None:
+        return segments_df.write_csv()
+    return _shared_segments_csv(content_hash, service.get_markers_key(), segments_df)
+
+
+def render_gpx_upload(service: GPXService) -> None:
     """Render GPX file upload section."""
     st.subheader("GPXファイルのアップロード")
 
@@ -46,8 +102,6 @@ def render_gpx_upload() -> None:
         horizontal=True,
     )
 
-    service: GPXService = st.session_state.gpx_service
-
     if upload_method == "ローカルファイル":
         uploaded_file = st.file_uploader(
             "GPXファイルを選択",
@@ -89,10 +143,8 @@ def render_gpx_upload() -> None:
                 st.warning("URLを入力してください")
 
 
-def render_gpx_stats() -> None:
+def render_gpx_stats(service: GPXService) -> None:
     """Render GPX statistics section."""
-    service: GPXService = st.session_state.gpx_service
-
     if not service.is_loaded():
         return
 
@@ -117,21 +169,22 @@ def render_gpx_stats() -> None:
     st.caption(f"トラックポイント数: {stats.total_points:,}")
 
 
-def _render_coordinate_input() -> None:
-    """Render coordinate input section."""
-    coord_method = st.radio(
-        "座標入力方法",
-        ["トラッククリック", "緯度経度入力"],
-        horizontal=True,
-        key="coord_method_radio",
-    )
+def _render_coordinate_input(coord_method: str) -> None:
+    """
+    Render coordinate input section.
+
+    Args:
+        coord_method: Selected coordinate input method ("トラッククリック" or "緯度経度入力")
+    """
+    state = st.session_state
+    current_lat, current_lon = state.current_lat, state.current_lon
 
     if coord_method == "緯度経度入力":
         col1, col2 = st.columns(2)
         with col1:
             lat_input = st.number_input(
                 "緯度",
-                value=st.session_state.current_lat if st.session_state.current_lat is not None else 35.0,
+                value=current_lat if current_lat is not None else 35.0,
                 format="%.6f",
                 min_value=-90.0,
                 max_value=90.0,
@@ -140,21 +193,20 @@ def _render_coordinate_input() -> None:
         with col2:
             lon_input = st.number_input(
                 "経度",
-                value=st.session_state.current_lon if st.session_state.current_lon is not None else 135.0,
+                value=current_lon if current_lon is not None else 135.0,
                 format="%.6f",
                 min_value=-180.0,
                 max_value=180.0,
                 key="lon_input",
             )
 
-        # Update coordinates and clear map click history when using manual input
-        if st.session_state.current_lat != lat_input or st.session_state.current_lon != lon_input:
-            st.session_state.current_lat = lat_input
-            st.session_state.current_lon = lon_input
-            st.session_state.last_map_click = None
+        # Update coordinates when using manual input
+        if current_lat != lat_input or current_lon != lon_input:
+            state.current_lat = lat_input
+            state.current_lon = lon_input
     # Show current click coordinates if available
-    elif st.session_state.current_lat is not None and st.session_state.current_lon is not None:
-        st.success(f"選択中の座標: ({st.session_state.current_lat:.6f}, {st.session_state.current_lon:.6f})")
+    elif current_lat is not None and current_lon is not None:
+        st.success(f"選択中の座標: ({current_lat:.6f}, {current_lon:.6f})")
         st.caption("右側の地図上にオレンジ色のマーカーが表示されています")
         st.info("マーカーは最も近いGPXトラックポイントに自動配置されます")
     else:
@@ -167,14 +219,16 @@ def _handle_add_marker(service: GPXService, marker_name: str) -> None:
         st.warning("マーカー名を入力してください")
         return
 
-    if st.session_state.current_lat is None or st.session_state.current_lon is None:
+    state = st.session_state
+    current_lat, current_lon = state.current_lat, state.current_lon
+    if current_lat is None or current_lon is None:
         st.warning("座標を指定してください(トラックラインをクリックするか緯度経度を入力)")
         return
 
     # Validate coordinates are valid numbers
     try:
-        lat = float(st.session_state.current_lat)
-        lon = float(st.session_state.current_lon)
+        lat = float(current_lat)
+        lon = float(current_lon)
 
         if not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
             st.error("座標が範囲外です (緯度: -90〜90, 経度: -180〜180)")
@@ -184,12 +238,11 @@ def _handle_add_marker(service: GPXService, marker_name: str) -> None:
         service.add_marker(marker_name.strip(), lat, lon, insert_before_last=True)
 
         # Store success message in session state
-        st.session_state.marker_add_success = f"マーカー '{marker_name}' を追加しました"
+        state.marker_add_success = f"マーカー '{marker_name}' を追加しました"
 
         # Reset coordinates but keep marker name for consecutive additions
-        st.session_state.current_lat = None
-        st.session_state.current_lon = None
-        st.session_state.last_map_click = None
+        state.current_lat = None
+        state.current_lon = None
 
         st.rerun()
 
@@ -202,6 +255,14 @@ def _handle_add_marker(service: GPXService, marker_name: str) -> None:
         st.error(f"マーカー追加エラー: {e!s}")
 
 
+def _move_marker(service: GPXService, index: int, *, up: bool) -> None:
+    """Move a marker one place up or down the list (button click callback)."""
+    if up:
+        service.move_marker_up(index)
+    else:
+        service.move_marker_down(index)
+
+
 def _render_markers_list(service: GPXService) -> None:
     """Render list of existing markers."""
     markers = service.get_markers()
@@ -223,36 +284,43 @@ def _render_markers_list(service: GPXService) -> None:
                 f"{marker.track_point.distance_from_start / 1000:.2f}km"
             )
             if marker.track_point.course is not None:
-                directions = ["北", "北東", "東", "南東", "南", "南西", "西", "北西"]
-                direction_index = int((marker.track_point.course + 22.5) / 45) % 8
-                direction = directions[direction_index]
-                info_text += f" [{direction}]"
+                info_text += f" [{direction_name(marker.track_point.course)}]"
             st.text(info_text)
         with col2:
             # Move up/down buttons
+            # Changes are applied in click callbacks, which run before the rerun the click
+            # already triggers, so the list is redrawn in order without a second st.rerun().
             subcol1, subcol2 = st.columns(2)
             with subcol1:
-                if st.button("↑", key=f"move_up_marker_{i}", help="上に移動", disabled=(i == 0)):
-                    service.move_marker_up(i)
-                    st.rerun()
+                st.button(
+                    "↑",
+                    key=f"move_up_marker_{i}",
+                    help="上に移動",
+                    disabled=(i == 0),
+                    on_click=_move_marker,
+                    args=(service, i),
+                    kwargs={"up": True},
+                )
             with subcol2:
-                if st.button("↓", key=f"move_down_marker_{i}", help="下に移動", disabled=(i == len(markers) - 1)):
-                    service.move_marker_down(i)
-                    st.rerun()
+                st.button(
+                    "↓",
+                    key=f"move_down_marker_{i}",
+                    help="下に移動",
+                    disabled=(i == len(markers) - 1),
+                    on_click=_move_marker,
+                    args=(service, i),
+                    kwargs={"up": False},
+                )
         with col3:
-            if st.button("削除", key=f"delete_marker_{i}", help="マーカーを削除"):
-                service.remove_marker(i)
-                st.rerun()
+            st.button(
+                "削除", key=f"delete_marker_{i}", help="マーカーを削除", on_click=service.remove_marker, args=(i,)
+            )
 
-    if st.button("すべてのマーカーをクリア", type="secondary", width="stretch"):
-        service.clear_markers()
-        st.rerun()
+    st.button("すべてのマーカーをクリア", type="secondary", width="stretch", on_click=service.clear_markers)
 
 
-def render_marker_input() -> None:
+def render_marker_input(service: GPXService) -> None:
     """Render marker input section."""
-    service: GPXService = st.session_state.gpx_service
-
     if not service.is_loaded():
         return
 
@@ -263,92 +331,113 @@ def render_marker_input() -> None:
         st.success(st.session_state.marker_add_success)
         del st.session_state.marker_add_success
 
-    col1, col2 = st.columns([2, 1])
+    # Outside the form: switching the method has to rerun to show the matching inputs
+    coord_method = st.radio(
+        "座標入力方法",
+        ["トラッククリック", "緯度経度入力"],
+        horizontal=True,
+        key="coord_method_radio",
+    )
 
-    with col1:
-        marker_name = st.text_input(
-            "マーカー名",
-            value=st.session_state.current_marker_name,
-            placeholder="例: CP1, エイドステーション",
-            key="marker_name_input",
-        )
+    # Outside the form as well: typed coordinates have to rerun to move the pending marker on the map
+    _render_coordinate_input(coord_method)
 
-    with col2:
-        st.write("")  # Spacing
-        st.write("")  # Spacing
+    # Name edits are sent on submit instead of rerunning the tab per keystroke
+    with st.form("add_marker_form", border=False):
+        col1, col2 = st.columns([2, 1])
 
-    _render_coordinate_input()
+        with col1:
+            marker_name = st.text_input(
+                "マーカー名",
+                value=st.session_state.current_marker_name,
+                placeholder="例: CP1, エイドステーション",
+                key="marker_name_input",
+            )
+
+        with col2:
+            st.write("")  # Spacing
+            st.write("")  # Spacing
 
-    # Add marker button
-    if st.button("マーカーを追加", type="primary", width="stretch", key="add_marker_button"):
+        # Add marker button
+        submitted = st.form_submit_button("マーカーを追加", type="primary", width="stretch", key="add_marker_button")
+
+    if submitted:
         _handle_add_marker(service, marker_name)
 
     _render_markers_list(service)
 
 
-def render_map_and_chart() -> None:
-    """Render map and elevation chart."""
-    service: GPXService = st.session_state.gpx_service
+def _store_map_click(clicked_coords: tuple[float, float]) -> None:
+    """Map click callback storing the clicked coordinates as the pending marker position."""
+    # Only called when the map reports a new click, so no duplicate check is needed
+    st.session_state.current_lat, st.session_state.current_lon = clicked_coords
 
+
+def render_map_and_chart(service: GPXService) -> None:
+    """Render map and elevation chart."""
     if not service.is_loaded():
         return
 
-    track_df = service.get_track_dataframe()
+    # Deferred so the page shell renders before folium/plotly are imported
+    from project.views.chart_view import ChartView  # noqa: PLC0415
+    from project.views.map_view import MapView  # noqa: PLC0415
+
+    state = st.session_state
+    track_df = _get_track_dataframe(service)
     markers = service.get_markers()
+    selected_segment = state.selected_segment
 
     # Map section
     st.subheader("トラックマップ")
 
     # Prepare pending coordinates for display
     pending_coords = None
-    if st.session_state.current_lat is not None and st.session_state.current_lon is not None:
-        pending_coords = (st.session_state.current_lat, st.session_state.current_lon)
+    if state.current_lat is not None and state.current_lon is not None:
+        pending_coords = (state.current_lat, state.current_lon)
 
-    map_data = MapView.render_map(
+    # Map clicks are stored by the click callback before the rerun they trigger
+    MapView.render_map(
         track_df,
         markers=markers,
-        highlight_segment=st.session_state.selected_segment,
+        highlight_segment=selected_segment,
         pending_coordinates=pending_coords,
+        on_click=_store_map_click,
+        track_key=service.get_content_hash(),
     )
 
-    # Handle map clicks
-    if map_data:
-        clicked_coords = MapView.get_clicked_coordinates(map_data)
-
-        # Check if this is a new click (avoid duplicate processing)
-        if clicked_coords and st.session_state.last_map_click != clicked_coords:
-            st.session_state.current_lat = clicked_coords[0]
-            st.session_state.current_lon = clicked_coords[1]
-            st.session_state.last_map_click = clicked_coords
-            st.rerun()
-
     # Show current selected coordinates on map
-    if st.session_state.current_lat is not None and st.session_state.current_lon is not None:
-        st.success(
-            f"**選択中の座標:** 緯度 {st.session_state.current_lat:.6f}, 経度 {st.session_state.current_lon:.6f}"
-        )
+    if pending_coords is not None:
+        st.success(f"**選択中の座標:** 緯度 {pending_coords[0]:.6f}, 経度 {pending_coords[1]:.6f}")
         st.caption("左側の「マーカー設定」でマーカー名を入力して、「マーカーを追加」ボタンを押してください")
         st.info("選択した座標から最も近いGPXトラック上のポイントに自動的に配置されます")
 
     # Elevation chart
     st.subheader("標高プロファイル")
 
-    selected_segment = None
-    if st.session_state.selected_segment:
-        start_idx, end_idx = st.session_state.selected_segment
-        selected_segment = service.get_segment(start_idx, end_idx)
-
     ChartView.render_elevation_profile(
         track_df,
         markers=markers,
         highlight_segment=selected_segment,
+        track_key=service.get_content_hash(),
+        markers_key=service.get_markers_key(),
     )
 
 
-def render_segments_table() -> None:
-    """Render segments summary table."""
-    service: GPXService = st.session_state.gpx_service
+def _segment_from_option(option: str, segment_options: list[str]) -> tuple[int, int] | None:
+    """Map a segment selector option to the (start, end) marker indices it highlights."""
+    if option not in segment_options:
+        return None
+    segment_idx = segment_options.index(option)
+    return (segment_idx, segment_idx + 1)
 
+
+def _store_selected_segment(segment_options: list[str]) -> None:
+    """Selector change callback storing the chosen segment in session state."""
+    st.session_state.selected_segment = _segment_from_option(st.session_state.segment_selector, segment_options)
+
+
+def render_segments_table(service: GPXService) -> None:
+    """Render segments summary table."""
     if not service.is_loaded():
         return
 
@@ -359,7 +448,7 @@ def render_segments_table() -> None:
 
     st.subheader("セグメント分析")
 
-    segments_df = service.get_segments_dataframe()
+    segments_df = _get_segments_dataframe(service)
 
     if not segments_df.is_empty():
         # Display dataframe
@@ -384,8 +473,9 @@ def render_segments_table() -> None:
 
         # Get current selection
         current_selection = "なし"
-        if st.session_state.selected_segment is not None:
-            start_idx, end_idx = st.session_state.selected_segment
+        selected_segment = st.session_state.selected_segment
+        if selected_segment is not None:
+            start_idx, end_idx = selected_segment
             if start_idx < len(segment_options) and end_idx == start_idx + 1:
                 current_selection = segment_options[start_idx]
 
@@ -393,25 +483,25 @@ def render_segments_table() -> None:
         all_options = ["なし", *segment_options]
         current_index = all_options.index(current_selection) if current_selection in all_options else 0
 
+        # The selection is stored in the change callback, before the rerun the change triggers,
+        # so the map and chart above are drawn with the new highlight in that same run
         selected = st.selectbox(
             "セグメントをハイライト",
             options=all_options,
             index=current_index,
             key="segment_selector",
+            on_change=_store_selected_segment,
+            args=(segment_options,),
         )
 
-        # Update selection and trigger rerun if changed
-        new_segment = None
-        if selected != "なし":
-            segment_idx = segment_options.index(selected)
-            new_segment = (segment_idx, segment_idx + 1)
-
-        if new_segment != st.session_state.selected_segment:
+        # Resync if the stored selection no longer matches the selector (e.g. after markers changed)
+        new_segment = _segment_from_option(selected, segment_options)
+        if new_segment != selected_segment:
             st.session_state.selected_segment = new_segment
             st.rerun()
 
         # CSV download
-        csv_data = segments_df.write_csv()
+        csv_data = _get_segments_csv(service, segments_df)
         st.download_button(
             label="CSVでダウンロード",
             data=csv_data,
@@ -421,11 +511,15 @@ def render_segments_table() -> None:
         )
 
 
-def render_gpx_analysis_tab() -> None:
-    """Render the GPX analysis tab."""
-    service: GPXService = st.session_state.gpx_service
+@st.fragment
+def render_gpx_analysis_tab(service: GPXService) -> None:
+    """
+    Render the GPX analysis tab.
 
-    render_gpx_upload()
+    Runs as a fragment so widget interactions inside the tab rerun only the tab,
+    not the page header and help tab.
+    """
+    render_gpx_upload(service)
 
     # Only show the rest of the UI if GPX is loaded
     if not service.is_loaded():
@@ -433,21 +527,27 @@ def render_gpx_analysis_tab() -> None:
 
     st.divider()
 
-    render_gpx_stats()
+    render_gpx_stats(service)
 
     st.divider()
 
     col1, col2 = st.columns([1, 2])
 
     with col1:
-        render_marker_input()
+        render_marker_input(service)
 
     with col2:
-        render_map_and_chart()
+        render_map_and_chart(service)
 
     st.divider()
 
-    render_segments_table()
+    render_segments_table(service)
+
+
+@st.cache_data(show_spinner=False)
+def _load_usage_markdown(usage_path: Path) -> str:
+    """Read the usage guide once per process; a missing file raises and is not cached."""
+    return usage_path.read_text(encoding="utf-8")
 
 
 def render_help_tab() -> None:
@@ -458,9 +558,7 @@ def render_help_tab() -> None:
     usage_path = Path(__file__).parent.parent / "usages" / "usage.md"
 
     try:
-        with usage_path.open(encoding="utf-8") as f:
-            usage_content = f.read()
-        st.markdown(usage_content)
+        st.markdown(_load_usage_markdown(usage_path))
     except FileNotFoundError:
         st.error(f"使用方法ファイルが見つかりません: {usage_path}")
         st.info("詳細な使用方法については、リポジトリのusages/usage.mdを参照してください。")
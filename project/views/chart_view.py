@@ -4,11 +4,15 @@ Chart visualization module for displaying elevation profiles.
 This module provides functionality to render elevation profile charts with interactive features.
 """
 
+import hashlib
+from collections.abc import Sequence
+
+import numpy as np
 import plotly.graph_objects as go
 import polars as pl
 import streamlit as st
 
-from project.application_services.marker_manager import Marker, Segment
+from project.application_services.marker_manager import Marker
 from project.settings import settings
 
 
@@ -18,31 +22,82 @@ class ChartView:
     @staticmethod
     def render_elevation_profile(
         track_df: pl.DataFrame,
-        markers: list[Marker] | None = None,
-        highlight_segment: Segment | None = None,
+        markers: Sequence[Marker] | None = None,
+        highlight_segment: tuple[int, int] | None = None,
+        track_key: str | None = None,
+        markers_key: str | None = None,
     ) -> None:
         """
         Render an interactive elevation profile chart.
 
+        The figure is cached per track, marker layout and highlighted segment,
+        so reruns that change none of them reuse the previous figure.
+
         Args:
             track_df: DataFrame containing track points (distance, elevation)
             markers: Optional list of Marker objects to display on the chart
-            highlight_segment: Optional segment to highlight on the chart
+            highlight_segment: Optional tuple of (start_index, end_index) of the markers bounding
+                the segment to highlight
+            track_key: Optional identifier of the track contents (e.g. the GPX content hash);
+                when omitted, the distance and elevation columns are hashed instead
+            markers_key: Optional identifier of the marker layout (e.g. GPXService.get_markers_key());
+                when omitted, the marker names and track point indices are hashed instead
         """
         if track_df.is_empty():
             st.warning("トラックデータがありません")
             return
 
-        # Convert distance to kilometers
-        distances_km = (track_df["distance"] / 1000.0).to_numpy()
-        elevations = track_df["elevation"].to_numpy()
+        # Key the cache on the track contents rather than hashing the DataFrame object
+        if track_key is None:
+            track_hash = hashlib.blake2b(digest_size=16)
+            track_hash.update(track_df["distance"].to_numpy())
+            track_hash.update(track_df["elevation"].to_numpy())
+            track_key = track_hash.hexdigest()
+        if markers_key is None:
+            markers_hash = hashlib.blake2b(digest_size=16)
+            for m in markers or ():
+                markers_hash.update(f"{m.track_point.index}:{m.name}\0".encode())
+            markers_key = markers_hash.hexdigest()
+
+        fig = _cached_elevation_figure(track_key, markers_key, highlight_segment, track_df, markers)
+
+        # Display chart
+        st.plotly_chart(fig, width="stretch")
+
+    @staticmethod
+    def build_elevation_figure(
+        track_df: pl.DataFrame,
+        markers: Sequence[Marker] | None = None,
+        highlight_segment: tuple[int, int] | None = None,
+    ) -> go.Figure:
+        """
+        Build the elevation profile figure.
+
+        Args:
+            track_df: DataFrame containing track points (distance, elevation)
+            markers: Optional list of Marker objects to display on the chart
+            highlight_segment: Optional tuple of (start_index, end_index) of the markers bounding
+                the segment to highlight
+
+        Returns:
+            Plotly figure with the profile, highlighted segment and markers
+        """
+        # Convert distance to kilometers. Plotly sends NumPy arrays as binary typed arrays, so
+        # float32 halves the chart payload while keeping centimeter precision over 100+ km
+        track_distances_km = (track_df["distance"] / 1000.0).cast(pl.Float32).to_numpy()
+        track_elevations = track_df["elevation"].cast(pl.Float32).to_numpy()
+
+        # Thin dense recordings to what the chart width can show
+        distances_km, elevations = ChartView._decimate_profile(
+            track_distances_km, track_elevations, settings.max_chart_points
+        )
 
         # Create figure
         fig = go.Figure()
 
-        # Add main elevation profile
+        # Add main elevation profile (WebGL: long tracks are drawn on a canvas instead of as SVG paths)
         fig.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 x=distances_km,
                 y=elevations,
                 mode="lines",
@@ -55,44 +110,49 @@ class ChartView:
         )
 
         # Highlight segment if specified
-        if highlight_segment is not None:
-            segment_distances = [p.distance_from_start / 1000.0 for p in highlight_segment.track_points]
-            segment_elevations = [p.elevation for p in highlight_segment.track_points]
-
-            fig.add_trace(
-                go.Scatter(
-                    x=segment_distances,
-                    y=segment_elevations,
-                    mode="lines",
-                    name=f"{highlight_segment.start_marker.name} → {highlight_segment.end_marker.name}",
-                    line={"color": "red", "width": 4},
-                    hovertemplate="<b>距離:</b> %{x:.2f}km<br><b>標高:</b> %{y:.0f}m<extra></extra>",
+        if highlight_segment is not None and markers is not None:
+            start_idx, end_idx = highlight_segment
+            if 0 <= start_idx < len(markers) and 0 <= end_idx < len(markers):
+                start_marker = markers[start_idx]
+                end_marker = markers[end_idx]
+
+                # Track rows are in track point order, so the segment is a contiguous slice (a view, no copy)
+                first, last = sorted((start_marker.track_point.index, end_marker.track_point.index))
+
+                # Thinned like the profile: a long segment would otherwise outweigh the whole chart payload
+                segment_distances, segment_elevations = ChartView._decimate_profile(
+                    track_distances_km[first : last + 1], track_elevations[first : last + 1], settings.max_chart_points
                 )
-            )
-
-        # Add marker annotations
-        if markers:
-            for marker in markers:
-                distance_km = marker.track_point.distance_from_start / 1000.0
-                elevation = marker.track_point.elevation
 
+                # Also WebGL so it stays drawn above the profile; SVG and WebGL traces are layered separately
                 fig.add_trace(
-                    go.Scatter(
-                        x=[distance_km],
-                        y=[elevation],
-                        mode="markers+text",
-                        name=marker.name,
-                        marker={"size": 10, "color": "red"},
-                        text=[marker.name],
-                        textposition="top center",
-                        hovertemplate=(
-                            f"<b>{marker.name}</b><br>"
-                            f"距離: {distance_km:.2f}km<br>"
-                            f"標高: {elevation:.0f}m<extra></extra>"
-                        ),
+                    go.Scattergl(
+                        x=segment_distances,
+                        y=segment_elevations,
+                        mode="lines",
+                        name=f"{start_marker.name} → {end_marker.name}",
+                        line={"color": "red", "width": 4},
+                        hovertemplate="<b>距離:</b> %{x:.2f}km<br><b>標高:</b> %{y:.0f}m<extra></extra>",
                     )
                 )
 
+        # Add all markers as a single trace (one payload instead of one trace per marker)
+        if markers:
+            # Look the markers up in the track arrays instead of reading each marker's track point
+            marker_indices = np.fromiter((m.track_point.index for m in markers), dtype=np.intp, count=len(markers))
+            fig.add_trace(
+                go.Scatter(
+                    x=track_distances_km[marker_indices],
+                    y=track_elevations[marker_indices],
+                    mode="markers+text",
+                    name="マーカー",
+                    marker={"size": 10, "color": "red"},
+                    text=[m.name for m in markers],
+                    textposition="top center",
+                    hovertemplate="<b>%{text}</b><br>距離: %{x:.2f}km<br>標高: %{y:.0f}m<extra></extra>",
+                )
+            )
+
         # Update layout
         fig.update_layout(
             title="標高プロファイル",
@@ -104,5 +164,63 @@ class ChartView:
             legend={"orientation": "h", "yanchor": "bottom", "y": 1.02, "xanchor": "right", "x": 1},
         )
 
-        # Display chart
-        st.plotly_chart(fig, width="stretch")
+        return fig
+
+    @staticmethod
+    def _decimate_profile(x: np.ndarray, y: np.ndarray, max_points: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Reduce a profile to at most max_points samples, keeping its peaks and valleys.
+
+        The samples are split into consecutive near-equal buckets and the
+        lowest and highest sample of each bucket are kept (min/max decimation),
+        so climbs and summits look the same as with the full data.
+
+        Args:
+            x: Sample positions (e.g. distance), in track order
+            y: Sample values (e.g. elevation)
+            max_points: Maximum number of samples to keep
+
+        Returns:
+            Tuple of (x, y) with the selected samples in track order
+        """
+        n = len(y)
+        n_buckets = (max_points - 2) // 2  # Two samples per bucket plus both endpoints
+        if n <= max_points or n_buckets < 1:
+            return x, y
+
+        # Near-equal buckets whose edges are spread over the real samples, so none is empty or padded
+        edges = np.linspace(0, n, n_buckets + 1).astype(np.intp)
+        bucket_of = np.repeat(np.arange(n_buckets), np.diff(edges))
+
+        def first_match(bucket_values: np.ndarray) -> np.ndarray:
+            # Index of the first sample equal to its bucket's value, one per bucket
+            matches = np.flatnonzero(y == bucket_values[bucket_of])
+            _, first = np.unique(bucket_of[matches], return_index=True)
+            return matches[first]
+
+        keep = np.concatenate(
+            (
+                [0, n - 1],
+                first_match(np.minimum.reduceat(y, edges[:-1])),
+                first_match(np.maximum.reduceat(y, edges[:-1])),
+            )
+        )
+        keep = np.unique(keep)
+
+        return x[keep], y[keep]
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_elevation_figure(
+    track_key: str,  # noqa: ARG001
+    markers_key: str,  # noqa: ARG001
+    highlight_segment: tuple[int, int] | None,
+    _track_df: pl.DataFrame,
+    _markers: Sequence[Marker] | None,
+) -> go.Figure:
+    """
+    Build the elevation figure once per cache key.
+
+    The keys describe the inputs; the underscore-prefixed inputs themselves are not hashed.
+    """
+    return ChartView.build_elevation_figure(_track_df, _markers, highlight_segment)
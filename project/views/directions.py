@@ -0,0 +1,34 @@
+"""
+Cardinal direction names for course angles, shared by the map and the marker list.
+"""
+
+import numpy as np
+
+# Compass points for course angles, clockwise from north in 45° steps; an array for vectorized lookups
+DIRECTIONS = np.array(["北", "北東", "東", "南東", "南", "南西", "西", "北西"])
+
+
+def direction_index(courses: float | np.ndarray) -> np.ndarray:
+    """
+    Bin course angles into the eight compass points.
+
+    Args:
+        courses: Course angle(s) in degrees, clockwise from north
+
+    Returns:
+        Index (or array of indices) into DIRECTIONS; each point covers the 45° centred on it
+    """
+    return ((np.asarray(courses, dtype=np.float64) + 22.5) // 45).astype(np.intp) % 8
+
+
+def direction_name(course: float) -> str:
+    """
+    Get the cardinal direction name for a single course angle.
+
+    Args:
+        course: Course angle in degrees, clockwise from north
+
+    Returns:
+        Direction name from DIRECTIONS
+    """
+    return str(DIRECTIONS[direction_index(course)])
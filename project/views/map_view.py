@@ -4,16 +4,47 @@ Map visualization module for displaying GPX tracks and markers.
 This module provides functionality to render interactive maps with track data and markers.
 """
 
+import hashlib
 import math
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
 from typing import cast
 
 import folium
+import numpy as np
 import polars as pl
 import streamlit as st
 from streamlit_folium import st_folium
 
 from project.application_services.marker_manager import Marker
 from project.settings import settings
+from project.views.directions import DIRECTIONS, direction_index, direction_name
+
+# Session state key under which streamlit-folium stores the map's returned data
+_MAP_KEY = "track_map"
+
+# Direction arrow icon: a CSS triangle rotated to the course in degrees
+_ARROW_HTML = """
+<div style="
+    width: 0;
+    height: 0;
+    border-left: 8px solid transparent;
+    border-right: 8px solid transparent;
+    border-bottom: 24px solid #4169E1;
+    transform: rotate({course}deg);
+    transform-origin: center 16px;
+    filter: drop-shadow(0 0 2px white);
+"></div>
+"""
+
+
+@dataclass(frozen=True)
+class TrackLayer:
+    """Map inputs derived only from the track, shared by every rerun showing the same track."""
+
+    center: tuple[float, float]  # (latitude, longitude) the map is centered on
+    coords: list[list[float]]  # [latitude, longitude] of every track point
+    arrows: list[tuple[float, float, float, str]]  # (latitude, longitude, course, direction) of each arrow
 
 
 class MapView:
@@ -22,9 +53,12 @@ class MapView:
     @staticmethod
     def render_map(
         track_df: pl.DataFrame,
-        markers: list[Marker] | None = None,
+        markers: Sequence[Marker] | None = None,
         highlight_segment: tuple[int, int] | None = None,
         pending_coordinates: tuple[float, float] | None = None,
+        *,
+        on_click: Callable[[tuple[float, float]], None] | None = None,
+        track_key: str | None = None,
     ) -> dict | None:
         """
         Render an interactive map with the GPX track and markers.
@@ -34,6 +68,10 @@ class MapView:
             markers: List of Marker objects to display on the map
             highlight_segment: Optional tuple of (start_index, end_index) to highlight a segment
             pending_coordinates: Optional tuple of (latitude, longitude) for showing a temporary marker
+            on_click: Optional callback receiving the clicked (latitude, longitude); it runs before the
+                rerun triggered by the click, so the click is reflected without another rerun
+            track_key: Optional identifier of the track contents (e.g. the GPX content hash);
+                when omitted, the latitude, longitude and distance columns are hashed instead
 
         Returns:
             Dictionary containing map interaction data (clicked coordinates, etc.)
@@ -42,29 +80,19 @@ class MapView:
             st.warning("トラックデータがありません")
             return None
 
-        # Calculate center of the track
-        lat_mean = track_df["latitude"].mean()
-        lon_mean = track_df["longitude"].mean()
-        # Polars mean() returns a complex union type but at runtime it's always a numeric value
-        center_lat = float(cast("float", lat_mean)) if lat_mean is not None else 0.0
-        center_lon = float(cast("float", lon_mean)) if lon_mean is not None else 0.0
+        track_layer = MapView._get_track_layer(track_df, track_key)
 
         # Create map
         m = folium.Map(
-            location=[center_lat, center_lon],
+            location=list(track_layer.center),
             zoom_start=settings.default_map_zoom,
             tiles="OpenStreetMap",
         )
 
-        # Convert track data to list of coordinates
-        track_coords = [
-            [float(row[0]), float(row[1])] for row in track_df.select(["latitude", "longitude"]).iter_rows()
-        ]
-
         # Add the main track line with enhanced visibility (YAMAP-style)
         # Make the track thick and prominent for better clickability
         folium.PolyLine(
-            track_coords,
+            track_layer.coords,
             color="#FF6B35",  # Vibrant orange color for better visibility
             weight=5,
             opacity=0.85,
@@ -72,7 +100,7 @@ class MapView:
         ).add_to(m)
 
         # Add direction arrows along the track if course data is available
-        MapView._add_direction_arrows(m, track_df)
+        MapView._add_direction_arrows(m, track_layer.arrows)
 
         # Highlight segment if specified
         if highlight_segment is not None and markers is not None:
@@ -81,18 +109,11 @@ class MapView:
                 start_marker = markers[start_idx]
                 end_marker = markers[end_idx]
 
-                # Find track points between markers
-                start_dist = start_marker.track_point.distance_from_start
-                end_dist = end_marker.track_point.distance_from_start
+                # Track rows are in track point order, so the segment is a contiguous slice (no column scan)
+                first, last = sorted((start_marker.track_point.index, end_marker.track_point.index))
+                segment_df = track_df.slice(first, last - first + 1)
 
-                segment_df = track_df.filter(
-                    (pl.col("distance") >= min(start_dist, end_dist))
-                    & (pl.col("distance") <= max(start_dist, end_dist))
-                )
-
-                segment_coords = [
-                    [float(row[0]), float(row[1])] for row in segment_df.select(["latitude", "longitude"]).iter_rows()
-                ]
+                segment_coords = MapView._simplified_coords(segment_df)
 
                 folium.PolyLine(
                     segment_coords,
@@ -104,31 +125,23 @@ class MapView:
 
         # Add markers
         if markers:
-            for i, marker in enumerate(markers):
-                distance_km = marker.track_point.distance_from_start / 1000
-                elevation = marker.track_point.elevation
-                course = marker.track_point.course
-
-                # Build popup text with course information if available
-                popup_text = f"<b>{marker.name}</b><br>距離: {distance_km:.2f}km<br>標高: {elevation:.0f}m"
-                if course is not None:
-                    # Convert course to cardinal direction
-                    directions = ["北", "北東", "東", "南東", "南", "南西", "西", "北西"]
-                    direction_index = int((course + 22.5) / 45) % 8
-                    direction = directions[direction_index]
-                    popup_text += f"<br>方角: {course:.1f}° ({direction})"
+            # Start is red, goal is green and everything in between is blue
+            colors = ["blue"] * len(markers)
+            colors[-1] = "green"
+            colors[0] = "red"
 
+            for marker, color in zip(markers, colors, strict=True):
                 folium.Marker(
                     location=[marker.latitude, marker.longitude],
-                    popup=popup_text,
+                    popup=MapView._format_marker_popup(marker),
                     tooltip=marker.name,
-                    icon=folium.Icon(
-                        color="red" if i == 0 else "green" if i == len(markers) - 1 else "blue",
-                        icon="info-sign",
-                    ),
+                    icon=folium.Icon(color=color, icon="info-sign"),
                 ).add_to(m)
 
-        # Add pending/temporary marker for selected coordinates
+        # Add pending/temporary marker for selected coordinates. It is sent as a separate layer that
+        # the frontend swaps in place: the map itself stays identical between clicks, so it is not
+        # reloaded and keeps its zoom and position
+        pending_layer = folium.FeatureGroup(name="選択中", control=False)
         if pending_coordinates is not None:
             lat, lon = pending_coordinates
             folium.Marker(
@@ -136,128 +149,285 @@ class MapView:
                 popup="選択中の位置<br>マーカーを追加してください",
                 tooltip="選択中",
                 icon=folium.Icon(color="orange", icon="star", prefix="fa"),
-            ).add_to(m)
+            ).add_to(pending_layer)
+
+        def handle_change() -> None:
+            clicked_coords = MapView.get_clicked_coordinates(st.session_state.get(_MAP_KEY))
+            if on_click is not None and clicked_coords is not None:
+                on_click(clicked_coords)
 
         # Render map with streamlit-folium
         map_data = st_folium(
             m,
+            key=_MAP_KEY,
             width=None,
             height=settings.map_height,
             returned_objects=["last_clicked"],
+            feature_group_to_add=pending_layer,
+            on_change=handle_change,
         )
 
         return map_data
 
     @staticmethod
-    def _calculate_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    def _format_marker_popup(marker: Marker) -> str:
+        """
+        Build the popup HTML of a marker.
+
+        Args:
+            marker: Marker to describe
+
+        Returns:
+            Popup HTML with the name, distance, elevation and course (if available)
+        """
+        track_point = marker.track_point
+        popup_text = (
+            f"<b>{marker.name}</b><br>距離: {track_point.distance_from_start / 1000:.2f}km"
+            f"<br>標高: {track_point.elevation:.0f}m"
+        )
+
+        # Add course information if available
+        course = track_point.course
+        if course is not None:
+            # Convert course to cardinal direction
+            direction = direction_name(course)
+            popup_text += f"<br>方角: {course:.1f}° ({direction})"
+
+        return popup_text
+
+    @staticmethod
+    def _calculate_bearings(lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray) -> np.ndarray:
         """
-        Calculate the bearing (direction) between two points.
+        Calculate the bearings (directions) between pairs of points.
 
         Args:
-            lat1: Latitude of first point in degrees
-            lon1: Longitude of first point in degrees
-            lat2: Latitude of second point in degrees
-            lon2: Longitude of second point in degrees
+            lat1: Latitudes of the first points in degrees
+            lon1: Longitudes of the first points in degrees
+            lat2: Latitudes of the second points in degrees
+            lon2: Longitudes of the second points in degrees
 
         Returns:
-            Bearing in degrees (0-360)
+            Bearings in degrees (0-360), one per pair
         """
         # Convert to radians
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        lon_diff = math.radians(lon2 - lon1)
+        lat1_rad = np.radians(lat1)
+        lat2_rad = np.radians(lat2)
+        lon_diff = np.radians(lon2 - lon1)
 
         # Calculate bearing
-        x = math.sin(lon_diff) * math.cos(lat2_rad)
-        y = math.cos(lat1_rad) * math.sin(lat2_rad) - math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(lon_diff)
+        x = np.sin(lon_diff) * np.cos(lat2_rad)
+        y = np.cos(lat1_rad) * np.sin(lat2_rad) - np.sin(lat1_rad) * np.cos(lat2_rad) * np.cos(lon_diff)
 
-        bearing_rad = math.atan2(x, y)
-        bearing_deg = math.degrees(bearing_rad)
+        bearing_deg = np.degrees(np.arctan2(x, y))
 
         # Normalize to 0-360
         return (bearing_deg + 360) % 360
 
     @staticmethod
-    def _add_direction_arrows(m: folium.Map, track_df: pl.DataFrame) -> None:
+    def _get_track_layer(track_df: pl.DataFrame, track_key: str | None) -> TrackLayer:
         """
-        Add direction arrows along the track to show the direction of travel.
+        Get the track-derived map inputs, built once per track.
+
+        Only these inputs are cached; the folium objects are rebuilt every run
+        because a rendered folium map cannot be rendered again.
+
+        Args:
+            track_df: DataFrame containing track points
+            track_key: Identifier of the track contents, or None to hash the track columns
+
+        Returns:
+            TrackLayer for the track
+        """
+        if track_key is None:
+            track_hash = hashlib.blake2b(digest_size=16)
+            for column in ("latitude", "longitude", "distance"):
+                track_hash.update(track_df[column].to_numpy())
+            track_key = track_hash.hexdigest()
+        return _cached_track_layer(track_key, track_df)
+
+    @staticmethod
+    def build_track_layer(track_df: pl.DataFrame) -> TrackLayer:
+        """
+        Derive the map inputs that depend only on the track.
+
+        Args:
+            track_df: DataFrame containing track points (latitude, longitude, distance, course)
+
+        Returns:
+            TrackLayer with the map center, track coordinates and direction arrows
+        """
+        # Calculate center of the track (one NumPy reduction over both columns)
+        center = (0.0, 0.0)
+        if not track_df.is_empty():
+            center_lat, center_lon = track_df.select(["latitude", "longitude"]).to_numpy().mean(axis=0).tolist()
+            center = (center_lat, center_lon)
+
+        return TrackLayer(
+            center=center,
+            coords=MapView._simplified_coords(track_df),
+            arrows=MapView._find_direction_arrows(track_df),
+        )
+
+    @staticmethod
+    def _simplified_coords(track_df: pl.DataFrame) -> list[list[float]]:
+        """
+        Get the track coordinates for a map polyline, simplified to the map tolerance.
+
+        Args:
+            track_df: DataFrame containing track points (latitude, longitude)
+
+        Returns:
+            List of [latitude, longitude] of the retained points, in track order
+        """
+        # One array copy instead of a tuple per row
+        coords = track_df.select(["latitude", "longitude"]).to_numpy()
+        if len(coords) < 3:
+            return coords.tolist()
+
+        # Local equirectangular projection to meters; accurate enough at the scale of a tolerance
+        meters_per_degree = math.pi / 180 * 6371000
+        y = coords[:, 0] * meters_per_degree
+        x = coords[:, 1] * (meters_per_degree * math.cos(math.radians(float(coords[:, 0].mean()))))
+
+        keep = MapView._douglas_peucker(x, y, settings.map_simplify_tolerance_m)
+        return coords[keep].tolist()
+
+    @staticmethod
+    def _douglas_peucker(x: np.ndarray, y: np.ndarray, tolerance: float) -> np.ndarray:
+        """
+        Simplify a line with the Ramer-Douglas-Peucker algorithm.
+
+        Each span is split at the point farthest from its chord until no point
+        deviates more than the tolerance; the distances of a span are computed
+        in one vectorized pass.
+
+        Args:
+            x: Point x coordinates
+            y: Point y coordinates (same units as x)
+            tolerance: Maximum allowed distance of a dropped point from the simplified line
+
+        Returns:
+            Sorted indices of the retained points, always including both ends
+        """
+        n = len(x)
+        keep = np.zeros(n, dtype=bool)
+        keep[[0, n - 1]] = True
+
+        spans = [(0, n - 1)]
+        while spans:
+            start, end = spans.pop()
+            if end - start < 2:
+                continue
+
+            chord_x = x[end] - x[start]
+            chord_y = y[end] - y[start]
+            offset_x = x[start + 1 : end] - x[start]
+            offset_y = y[start + 1 : end] - y[start]
+            chord_length = math.hypot(chord_x, chord_y)
+            if chord_length > 0:
+                distances = np.abs(offset_x * chord_y - offset_y * chord_x) / chord_length
+            else:
+                # Closed span (e.g. a loop back to the start): distance to the shared end point
+                distances = np.hypot(offset_x, offset_y)
+
+            farthest = int(np.argmax(distances))
+            if distances[farthest] > tolerance:
+                split = start + 1 + farthest
+                keep[split] = True
+                spans.append((start, split))
+                spans.append((split, end))
+
+        return np.flatnonzero(keep)
+
+    @staticmethod
+    def _find_direction_arrows(track_df: pl.DataFrame) -> list[tuple[float, float, float, str]]:
+        """
+        Find where to place direction arrows along the track and which way they point.
 
         Args:
-            m: Folium map object
             track_df: DataFrame containing track points with course information
+
+        Returns:
+            List of (latitude, longitude, course in degrees, cardinal direction) per arrow
         """
-        if track_df.is_empty() or len(track_df) < 2:
-            return
+        n_points = track_df.height
+        if n_points < 2:
+            return []
 
         # Add arrows at regular intervals (every 2km)
         arrow_interval_meters = 2000
         total_distance_val = track_df["distance"].max()
 
         if total_distance_val is None:
-            return
+            return []
 
         total_distance = float(cast("float", total_distance_val))
-        current_dist = arrow_interval_meters  # Start from first interval, not at start
-
-        while current_dist <= total_distance:
-            # Find the point closest to this distance
-            point_row = track_df.filter(pl.col("distance") >= current_dist).head(1)
-
-            if not point_row.is_empty():
-                current_index = int(point_row["index"][0])
-                lat = float(point_row["latitude"][0])
-                lon = float(point_row["longitude"][0])
-
-                # Try to get course from GPX data first
-                course = None
-                if "course" in track_df.columns:
-                    course_val = point_row["course"][0]
-                    if course_val is not None:
-                        course = float(course_val)
-
-                # If no course data, calculate from adjacent points
-                if course is None and current_index > 0 and current_index < len(track_df) - 1:
-                    # Get previous and next points for better accuracy
-                    prev_row = track_df.filter(pl.col("index") == current_index - 1).head(1)
-                    next_row = track_df.filter(pl.col("index") == current_index + 1).head(1)
-
-                    if not prev_row.is_empty() and not next_row.is_empty():
-                        prev_lat = float(prev_row["latitude"][0])
-                        prev_lon = float(prev_row["longitude"][0])
-                        next_lat = float(next_row["latitude"][0])
-                        next_lon = float(next_row["longitude"][0])
-
-                        # Calculate bearing from previous to next point
-                        course = MapView._calculate_bearing(prev_lat, prev_lon, next_lat, next_lon)
-
-                # Add arrow if we have a course (from data or calculated)
-                if course is not None:
-                    # Convert course to cardinal direction for tooltip
-                    directions = ["北", "北東", "東", "南東", "南", "南西", "西", "北西"]
-                    direction_index = int((course + 22.5) / 45) % 8
-                    direction = directions[direction_index]
-
-                    # Create a custom arrow icon using DivIcon with CSS
-                    arrow_html = f"""
-                    <div style="
-                        width: 0;
-                        height: 0;
-                        border-left: 8px solid transparent;
-                        border-right: 8px solid transparent;
-                        border-bottom: 24px solid #4169E1;
-                        transform: rotate({course}deg);
-                        transform-origin: center 16px;
-                        filter: drop-shadow(0 0 2px white);
-                    "></div>
-                    """
-
-                    folium.Marker(
-                        location=[lat, lon],
-                        icon=folium.DivIcon(html=arrow_html, icon_size=(16, 24), icon_anchor=(8, 16)),
-                        tooltip=f"方角: {direction} ({course:.0f}°)",
-                    ).add_to(m)
-
-            current_dist += arrow_interval_meters
+
+        # Locate the first point at or beyond every interval in one sorted search (distances are cumulative),
+        # starting from the first interval, not at start
+        distances = track_df["distance"].to_numpy()
+        targets = np.arange(1, int(total_distance // arrow_interval_meters) + 1) * arrow_interval_meters
+        arrow_rows = np.searchsorted(distances, targets, side="left")
+        arrow_rows = arrow_rows[arrow_rows < n_points]
+
+        latitudes = track_df["latitude"].to_numpy()
+        longitudes = track_df["longitude"].to_numpy()
+        last_row = n_points - 1
+
+        # Try to get course from GPX data first (missing values become NaN)
+        if "course" in track_df.columns:
+            courses = track_df["course"].cast(pl.Float64).to_numpy()[arrow_rows]
+        else:
+            courses = np.full(len(arrow_rows), np.nan)
+
+        # If no course data, calculate bearing from the previous to the next point for better accuracy;
+        # all arrows in one call, then kept only where both neighbours exist
+        previous_rows = np.maximum(arrow_rows - 1, 0)
+        next_rows = np.minimum(arrow_rows + 1, last_row)
+        bearings = MapView._calculate_bearings(
+            latitudes[previous_rows], longitudes[previous_rows], latitudes[next_rows], longitudes[next_rows]
+        )
+        has_neighbours = (arrow_rows > 0) & (arrow_rows < last_row)
+        courses = np.where(np.isnan(courses) & has_neighbours, bearings, courses)
+
+        # Add arrow if we have a course (from data or calculated)
+        has_course = ~np.isnan(courses)
+        arrow_rows = arrow_rows[has_course]
+        courses = courses[has_course]
+
+        # Convert course to cardinal direction for tooltip
+        directions = DIRECTIONS[direction_index(courses)]
+
+        return list(
+            zip(
+                latitudes[arrow_rows].tolist(),
+                longitudes[arrow_rows].tolist(),
+                courses.tolist(),
+                directions.tolist(),
+                strict=True,
+            )
+        )
+
+    @staticmethod
+    def _add_direction_arrows(m: folium.Map, arrows: Sequence[tuple[float, float, float, str]]) -> None:
+        """
+        Add direction arrows along the track to show the direction of travel.
+
+        Args:
+            m: Folium map object
+            arrows: (latitude, longitude, course in degrees, cardinal direction) per arrow
+        """
+        # One layer group for all arrows instead of one top-level map child per arrow
+        arrow_layer = folium.FeatureGroup(name="方角", control=False)
+
+        for lat, lon, course, direction in arrows:
+            folium.Marker(
+                location=[lat, lon],
+                icon=folium.DivIcon(html=_ARROW_HTML.format(course=course), icon_size=(16, 24), icon_anchor=(8, 16)),
+                tooltip=f"方角: {direction} ({course:.0f}°)",
+            ).add_to(arrow_layer)
+
+        arrow_layer.add_to(m)
 
     @staticmethod
     def get_clicked_coordinates(map_data: dict | None) -> tuple[float, float] | None:
@@ -284,3 +454,13 @@ class MapView:
             return (float(lat), float(lng))
 
         return None
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _cached_track_layer(track_key: str, _track_df: pl.DataFrame) -> TrackLayer:  # noqa: ARG001
+    """
+    Build the track-derived map inputs once per cache key.
+
+    The key describes the track; the underscore-prefixed DataFrame itself is not hashed.
+    """
+    return MapView.build_track_layer(_track_df)
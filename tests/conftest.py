@@ -36,12 +36,12 @@ def streamlit_app():
         stderr=subprocess.PIPE,
     )
 
-    # Wait for app to be ready (max 30 seconds)
+    # Wait for app to be ready (max 30 seconds), polling quickly at first and backing off up to 1 second
     app_url = "http://localhost:8501"
-    max_retries = 60
-    retry_delay = 0.5
+    deadline = time.monotonic() + 30
+    retry_delay = 0.02
 
-    for _ in range(max_retries):
+    while time.monotonic() < deadline:
         # Check if process is still running
         if process.poll() is not None:
             # Process has terminated, read error output
@@ -55,7 +55,9 @@ def streamlit_app():
             if response.status_code == 200:
                 break
         except (requests.ConnectionError, requests.Timeout):
-            time.sleep(retry_delay)
+            pass
+        time.sleep(retry_delay)
+        retry_delay = min(retry_delay * 1.5, 1.0)
     else:
         # Timeout - get error output before terminating
         process.terminate()
@@ -92,10 +94,9 @@ def setup_e2e_tests(request):
         request.getfixturevalue("streamlit_app")
 
 
-@pytest.fixture
-def sample_gpx() -> GPX:
+def _build_sample_gpx() -> GPX:
     """
-    Create a sample GPX object for testing.
+    Build the sample GPX track shared by the fixtures.
 
     Returns:
         GPX object with a simple track
@@ -133,18 +134,39 @@ def sample_gpx() -> GPX:
 
 
 @pytest.fixture
-def sample_gpx_bytes(sample_gpx: GPX) -> io.BytesIO:
+def sample_gpx() -> GPX:
+    """
+    Create a sample GPX object for testing.
+
+    Returns:
+        GPX object with a simple track (a new one per test, so tests may modify it)
+    """
+    return _build_sample_gpx()
+
+
+@pytest.fixture(scope="session")
+def sample_gpx_xml() -> bytes:
+    """
+    Serialize the sample GPX once per test session.
+
+    Returns:
+        UTF-8 encoded GPX XML of the sample track
+    """
+    return _build_sample_gpx().to_xml().encode("utf-8")
+
+
+@pytest.fixture
+def sample_gpx_bytes(sample_gpx_xml: bytes) -> io.BytesIO:
     """
-    Convert sample GPX to bytes for file upload simulation.
+    Wrap the sample GPX XML in a file object for upload simulation.
 
     Args:
-        sample_gpx: Sample GPX fixture
+        sample_gpx_xml: Serialized sample GPX fixture
 
     Returns:
-        BytesIO object containing GPX data
+        BytesIO object containing GPX data (a new stream per test)
     """
-    gpx_string = sample_gpx.to_xml()
-    return io.BytesIO(gpx_string.encode("utf-8"))
+    return io.BytesIO(sample_gpx_xml)
 
 
 @pytest.fixture
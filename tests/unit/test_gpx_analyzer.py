@@ -2,6 +2,8 @@
 Unit tests for GPX analyzer module.
 """
 
+import math
+
 import numpy as np
 import pytest
 from gpxpy.gpx import GPX
@@ -9,6 +11,16 @@ from gpxpy.gpx import GPX
 from project.data_accessors.gpx_analyzer import GPXAnalyzer
 
 
+def _reference_haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great circle distance in meters between two points given in degrees."""
+    lat1_rad, lon1_rad, lat2_rad, lon2_rad = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (
+        math.sin((lat2_rad - lat1_rad) / 2.0) ** 2
+        + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin((lon2_rad - lon1_rad) / 2.0) ** 2
+    )
+    return 6371000 * 2 * math.asin(math.sqrt(a))
+
+
 class TestGPXAnalyzer:
     """Test cases for GPXAnalyzer class."""
 
@@ -24,6 +36,17 @@ class TestGPXAnalyzer:
         assert points[0].distance_from_start == pytest.approx(0.0)
         assert points[0].index == 0
 
+    def test_get_track_points_matches_extract(self, sample_gpx: GPX) -> None:
+        """Test that on-demand track points match the fully extracted list."""
+        lazy = GPXAnalyzer(sample_gpx)
+        points = GPXAnalyzer(sample_gpx).extract_track_points()
+
+        assert lazy.get_track_point_count() == 10
+        assert lazy.get_track_points(3, 7) == points[3:7]
+        assert lazy.get_track_point(-1) == points[-1]
+        with pytest.raises(IndexError):
+            lazy.get_track_point(10)
+
     def test_get_dataframe(self, sample_gpx: GPX) -> None:
         """Test getting track data as DataFrame."""
         analyzer = GPXAnalyzer(sample_gpx)
@@ -59,6 +82,15 @@ class TestGPXAnalyzer:
         assert nearest.latitude == pytest.approx(35.3640, abs=0.001)
         assert nearest.longitude == pytest.approx(138.7290, abs=0.001)
 
+    def test_find_nearest_points(self, sample_gpx: GPX) -> None:
+        """Test finding nearest points for several coordinates at once."""
+        analyzer = GPXAnalyzer(sample_gpx)
+
+        nearest = analyzer.find_nearest_points([35.3641, 35.3606, 35.3779], [138.7291, 138.7274, 138.7431])
+
+        assert [p.index for p in nearest] == [2, 0, 9]
+        assert nearest[0] == analyzer.find_nearest_point(35.3641, 138.7291)
+
     def test_get_segment_between_points(self, sample_gpx: GPX) -> None:
         """Test getting segment between two points."""
         analyzer = GPXAnalyzer(sample_gpx)
@@ -72,18 +104,53 @@ class TestGPXAnalyzer:
         assert ascent > 0  # Should be ascending
         assert descent >= 0
 
+    def test_get_segment_between_points_reversed(self, sample_gpx: GPX) -> None:
+        """Test that segment statistics do not depend on point order."""
+        analyzer = GPXAnalyzer(sample_gpx)
+        points = analyzer.extract_track_points()
+
+        forward = analyzer.get_segment_between_points(points[2], points[7])
+        backward = analyzer.get_segment_between_points(points[7], points[2])
+
+        assert forward[0] == backward[0]
+        assert forward[1:] == pytest.approx(backward[1:])
+
+    def test_segments_add_up_to_track_totals(self, sample_gpx: GPX) -> None:
+        """Test that segment statistics share the track's elevation profile."""
+        analyzer = GPXAnalyzer(sample_gpx)
+        stats = analyzer.calculate_stats()
+
+        distances, ascents, descents = analyzer.get_segments_stats([0, 4, 6, 9])
+
+        assert len(distances) == 3
+        assert distances.sum() == pytest.approx(stats.total_distance)
+        assert ascents.sum() == pytest.approx(stats.total_ascent)
+        assert descents.sum() == pytest.approx(stats.total_descent)
+
     def test_haversine_distance(self) -> None:
         """Test haversine distance calculation."""
         # Tokyo to Yokohama (approximate)
-        distance = GPXAnalyzer._haversine_distance(
-            35.6762,
-            139.6503,  # Tokyo
-            35.4437,
-            139.6380,  # Yokohama
+        distances = GPXAnalyzer._haversine_distances(
+            np.radians([35.6762, 35.4437]),
+            np.radians([139.6503, 139.6380]),
         )
 
         # Should be approximately 26-28 km
-        assert 25000 < distance < 30000
+        assert distances.shape == (1,)
+        assert 25000 < distances[0] < 30000
+
+    def test_haversine_distances_matches_reference(self) -> None:
+        """Test that the vectorized haversine matches a straightforward formula pair by pair."""
+        latitudes = np.array([35.6762, 35.4437, 35.3606, 35.3606])
+        longitudes = np.array([139.6503, 139.6380, 138.7274, 138.7274])
+
+        distances = GPXAnalyzer._haversine_distances(np.radians(latitudes), np.radians(longitudes))
+
+        expected = [
+            _reference_haversine(latitudes[i], longitudes[i], latitudes[i + 1], longitudes[i + 1])
+            for i in range(len(latitudes) - 1)
+        ]
+        np.testing.assert_allclose(distances, expected)
 
     def test_smooth_elevation(self) -> None:
         """Test elevation smoothing."""
@@ -124,6 +191,19 @@ class TestGPXAnalyzer:
         # Smoothed values should have less or equal variance (never more)
         assert np.std(smoothed) <= np.std(elevations)
 
+    def test_remove_outliers(self) -> None:
+        """Test that spikes are replaced by interpolation and clean data is returned as is."""
+        elevations = np.linspace(100.0, 120.0, 21)
+
+        assert GPXAnalyzer._remove_outliers(elevations) is elevations
+
+        spiked = elevations.copy()
+        spiked[10] = 5000.0
+        cleaned = GPXAnalyzer._remove_outliers(spiked)
+
+        assert cleaned[10] == pytest.approx(110.0)
+        assert spiked[10] == 5000.0  # Input is not modified
+
     def test_calculate_elevation_gain_loss(self) -> None:
         """Test elevation gain/loss calculation with threshold."""
         # Create elevation profile with clear ascent and descent
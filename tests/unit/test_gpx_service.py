@@ -3,10 +3,14 @@ Unit tests for GPX service module.
 """
 
 import io
+from itertools import pairwise
 
 import pytest
+from gpxpy.gpx import GPX, GPXWaypoint
 
 from project.application_services.gpx_service import GPXService
+from project.data_accessors.gpx_loader import GPXLoader, GPXLoadError
+from project.settings import settings
 
 
 class TestGPXService:
@@ -24,6 +28,71 @@ class TestGPXService:
         service.load_from_file(sample_gpx_bytes)
 
         assert service.is_loaded()
+        assert service.get_content_hash() == GPXLoader.hash_content(sample_gpx_bytes.getvalue())
+
+    def test_load_from_file_reuses_parsed_gpx(self, sample_gpx_bytes: io.BytesIO) -> None:
+        """Test that loading identical content twice reuses the parsed GPX."""
+        first = GPXService()
+        first.load_from_file(io.BytesIO(sample_gpx_bytes.getvalue()))
+        second = GPXService()
+        second.load_from_file(io.BytesIO(sample_gpx_bytes.getvalue()))
+
+        assert first._gpx is second._gpx
+
+    def test_load_from_file_reuses_analyzer(self, sample_gpx_bytes: io.BytesIO) -> None:
+        """Test that loading identical content twice shares the analyzer but not the markers."""
+        first = GPXService()
+        first.load_from_file(io.BytesIO(sample_gpx_bytes.getvalue()))
+        second = GPXService()
+        second.load_from_file(io.BytesIO(sample_gpx_bytes.getvalue()))
+
+        second.add_marker("Mid", 35.3700, 138.7350, insert_before_last=True)
+
+        assert first._analyzer is second._analyzer
+        assert second._gpx is second._loaded_analyzer.gpx
+        assert len(first.get_markers()) == 2
+        assert len(second.get_markers()) == 3
+
+    def test_load_from_url_shares_file_caches(
+        self, sample_gpx_bytes: io.BytesIO, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a URL load gets a content hash and shares the caches of a file load."""
+        content = sample_gpx_bytes.getvalue()
+        monkeypatch.setattr(GPXLoader, "download", lambda url: bytearray(content))  # noqa: ARG005
+
+        from_file = GPXService()
+        from_file.load_from_file(io.BytesIO(content))
+        from_url = GPXService()
+        from_url.load_from_url("https://example.com/track.gpx")
+
+        assert from_url.get_content_hash() == from_file.get_content_hash()
+        assert from_url._analyzer is from_file._analyzer
+
+    def test_load_from_file_rejects_oversized_file(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an oversized upload is rejected before it is read."""
+        monkeypatch.setattr(settings, "max_gpx_file_size_mb", 1)
+        file = io.BytesIO(b" " * (2 * 1024 * 1024))
+        service = GPXService()
+
+        with pytest.raises(GPXLoadError, match="exceeds maximum allowed size"):
+            service.load_from_file(file)
+
+        assert file.tell() == 0
+        assert not service.is_loaded()
+
+    def test_load_waypoints_as_markers(self, sample_gpx: GPX) -> None:
+        """Test that start, waypoints and goal are loaded as markers in order."""
+        sample_gpx.waypoints.append(GPXWaypoint(latitude=35.3661, longitude=138.7309, name="CP1"))
+        sample_gpx.waypoints.append(GPXWaypoint(latitude=35.3739, longitude=138.7391, name="CP2"))
+
+        service = GPXService()
+        service.load_gpx(sample_gpx)
+
+        markers = service.get_markers()
+
+        assert [m.name for m in markers] == ["スタート", "CP1", "CP2", "ゴール"]
+        assert [m.track_point.index for m in markers] == [0, 3, 7, 9]
+        assert service.get_waypoint_count() == 2
 
     def test_get_stats_before_loading(self) -> None:
         """Test getting stats before loading GPX."""
@@ -132,6 +201,53 @@ class TestGPXService:
         assert segments[1].start_marker.name == "Mid"
         assert segments[1].end_marker.name == "End"
 
+    def test_get_segments_matches_get_segment(self, sample_gpx_bytes: io.BytesIO) -> None:
+        """Test that bulk segment calculation matches the per-pair calculation."""
+        service = GPXService()
+        service.load_from_file(sample_gpx_bytes)
+
+        service.add_marker("Mid", 35.3700, 138.7350, insert_before_last=True)
+
+        for i, segment in enumerate(service.get_segments()):
+            single = service.get_segment(i, i + 1)
+
+            assert single is not None
+            assert segment.distance == pytest.approx(single.distance)
+            assert segment.ascent == pytest.approx(single.ascent)
+            assert segment.descent == pytest.approx(single.descent)
+            assert segment.track_points == single.track_points
+
+    def test_get_segments_after_reordering(self, sample_gpx_bytes: io.BytesIO) -> None:
+        """Test that segments follow markers through move and remove operations."""
+        service = GPXService()
+        service.load_from_file(sample_gpx_bytes)
+
+        service.add_marker("Mid1", 35.3700, 138.7350, insert_before_last=True)
+        service.add_marker("Mid2", 35.3780, 138.7430, insert_before_last=True)
+        service.move_marker_up(2)
+        service.remove_marker(0)
+
+        markers = service.get_markers()
+        segments = service.get_segments()
+
+        assert [m.name for m in markers] == ["Mid2", "Mid1", "ゴール"]
+        for segment, (start, end) in zip(segments, pairwise(markers), strict=True):
+            expected = abs(end.track_point.distance_from_start - start.track_point.distance_from_start)
+            assert segment.start_marker is start
+            assert segment.end_marker is end
+            assert segment.distance == pytest.approx(expected)
+
+    def test_get_marker_distances_km(self, sample_gpx_bytes: io.BytesIO) -> None:
+        """Test that marker distances follow the marker list."""
+        service = GPXService()
+        service.load_from_file(sample_gpx_bytes)
+
+        service.add_marker("Mid", 35.3700, 138.7350, insert_before_last=True)
+        service.move_marker_up(1)
+
+        expected = [m.track_point.distance_from_start / 1000 for m in service.get_markers()]
+        assert service.get_marker_distances_km().tolist() == pytest.approx(expected)
+
     def test_get_segment(self, sample_gpx_bytes: io.BytesIO) -> None:
         """Test getting a specific segment."""
         service = GPXService()
@@ -172,6 +288,68 @@ class TestGPXService:
         assert "ascent_m" in df.columns
         assert "descent_m" in df.columns
 
+    def test_get_segments_dataframe_matches_segments(self, sample_gpx_bytes: io.BytesIO) -> None:
+        """Test that the segments DataFrame has the same values as the Segment objects."""
+        service = GPXService()
+        service.load_from_file(sample_gpx_bytes)
+
+        service.add_marker("Mid", 35.3700, 138.7350, insert_before_last=True)
+        service.move_marker_up(1)
+
+        df = service.get_segments_dataframe()
+        segments = service.get_segments()
+
+        assert df["start"].to_list() == [s.start_marker.name for s in segments]
+        assert df["end"].to_list() == [s.end_marker.name for s in segments]
+        assert df["distance_km"].to_list() == pytest.approx([s.distance / 1000 for s in segments])
+        assert df["ascent_m"].to_list() == pytest.approx([s.ascent for s in segments])
+        assert df["descent_m"].to_list() == pytest.approx([s.descent for s in segments])
+        assert df["gradient_pct"].to_list() == pytest.approx([s.avg_gradient for s in segments])
+
+    def test_get_segments_dataframe_cache_invalidation(self, sample_gpx_bytes: io.BytesIO) -> None:
+        """Test that the segments DataFrame is reused until markers change."""
+        service = GPXService()
+        service.load_from_file(sample_gpx_bytes)
+
+        # Clear auto-added markers (スタート and ゴール)
+        service.clear_markers()
+
+        service.add_marker("Start", 35.3606, 138.7274)
+        service.add_marker("End", 35.3780, 138.7430)
+
+        df = service.get_segments_dataframe()
+        assert service.get_segments_dataframe() is df
+
+        service.add_marker("Mid", 35.3700, 138.7350, insert_before_last=True)
+        df = service.get_segments_dataframe()
+
+        assert df.shape[0] == 2
+        assert df["end"].to_list() == ["Mid", "End"]
+
+        service.move_marker_down(0)
+        df = service.get_segments_dataframe()
+
+        assert df["start"].to_list() == ["Mid", "Start"]
+
+    def test_get_markers_key(self, sample_gpx_bytes: io.BytesIO) -> None:
+        """Test that the markers key follows the marker layout."""
+        service = GPXService()
+        service.load_from_file(sample_gpx_bytes)
+        other = GPXService()
+        other.load_from_file(io.BytesIO(sample_gpx_bytes.getvalue()))
+
+        assert service.get_markers_key() == other.get_markers_key()
+
+        service.add_marker("Mid", 35.3700, 138.7350, insert_before_last=True)
+        key = service.get_markers_key()
+        assert key != other.get_markers_key()
+
+        service.move_marker_up(1)
+        assert service.get_markers_key() != key
+
+        service.move_marker_down(0)
+        assert service.get_markers_key() == key
+
     def test_get_segments_dataframe_no_markers(self, sample_gpx_bytes: io.BytesIO) -> None:
         """Test getting segments DataFrame with no markers."""
         service = GPXService()